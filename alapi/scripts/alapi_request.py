@@ -1,25 +1,102 @@
 #!/usr/bin/env python3
-"""Call an ALAPI endpoint with token auth and a JSON body."""
+"""Call an ALAPI endpoint with token auth and a JSON body.
+
+With ``--batch``, read JSONL records of ``{"endpoint": ..., "body": ...}`` from a
+file (or ``-`` for stdin) and send them over a bounded pool of keep-alive
+connections, writing one JSONL result per record.
+
+The CLI is a thin wrapper over ``AlapiClient``, which other scripts can import
+to make several calls over pooled keep-alive connections::
+
+    from alapi_request import AlapiClient
+
+    with AlapiClient() as client:
+        data = client.call("/api/ip", {"ip": "8.8.8.8"})
+
+Successful responses of idempotent endpoints are cached on disk (SQLite under
+``~/.cache/alapi``) for the per-endpoint TTL of ``cache_policy.json``; pass a
+``ResponseCache`` to the client to use it from Python.
+
+Calls are paced by a token bucket shared by every process on the host, 429
+and 5xx responses are retried with exponential backoff, and the ``usage``
+units reported by responses are counted against an optional local quota.
+
+Identical concurrent requests share one HTTP call. ``--serve`` runs the client
+as a daemon on a unix socket, and ``--daemon`` sends calls through it, so
+that sharing (and the pool and cache) also spans processes.
+"""
 
 from __future__ import annotations
 
 import argparse
+import fnmatch
+import gzip
+import hashlib
+import http.client
+import io
 import json
 import os
+import random
+import signal
+import socket
+import socketserver
+import sqlite3
 import sys
-import urllib.error
-import urllib.request
+import threading
+import time
+import urllib.parse
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, replace
+from datetime import datetime
 from pathlib import Path
+from typing import Callable, Iterable, Iterator, TextIO
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: limits are per process only
+    fcntl = None
 
 
 DEFAULT_BASE_URL = "https://v3.alapi.cn"
+DEFAULT_CONCURRENCY = 8
+DEFAULT_TIMEOUT = 30.0
+# Records submitted ahead of the output, per worker, so memory stays bounded.
+BATCH_WINDOW_PER_WORKER = 4
+CACHE_POLICY_FILE = Path(__file__).resolve().with_name("cache_policy.json")
+DEFAULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_QPS = 10.0
+DEFAULT_MAX_RETRIES = 3
+RETRY_BASE_SECONDS = 0.5
+RETRY_MAX_SECONDS = 30.0
+# Options that configure the daemon's own client and so have no effect on --daemon calls.
+DAEMON_SETTINGS = ("token", "base_url", "no_cache", "cache_policy", "qps", "max_retries", "quota", "quota_period")
+
+
+def _env_default(parser: argparse.ArgumentParser, name: str, type_, default, choices=None):
+    """Return environment variable ``name`` as a default for ``parser``, checked like an argument."""
+    value = os.environ.get(name)
+    if not value:
+        return default
+    try:
+        converted = type_(value)
+    except ValueError:
+        parser.error(f"invalid {name} value: {value!r}")
+    if choices is not None and converted not in choices:
+        parser.error(f"invalid {name} value: {value!r} (choose from {', '.join(map(repr, choices))})")
+    return converted
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Send a POST request to an ALAPI endpoint using ALAPI_TOKEN."
     )
-    parser.add_argument("endpoint", help="Endpoint path such as /api/ip or /api/ai/translate")
+    parser.add_argument(
+        "endpoint",
+        nargs="?",
+        help="Endpoint path such as /api/ip or /api/ai/translate. Omit with --batch.",
+    )
     parser.add_argument(
         "--body",
         default="{}",
@@ -35,13 +112,105 @@ def parse_args() -> argparse.Namespace:
         help="Override ALAPI_TOKEN for this call. Prefer the environment variable.",
     )
     parser.add_argument("--base-url", default=DEFAULT_BASE_URL, help="ALAPI base URL.")
-    parser.add_argument("--timeout", type=float, default=30.0, help="Request timeout in seconds.")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Request timeout in seconds.")
     parser.add_argument(
         "--raw",
         action="store_true",
         help="Print the raw response body instead of pretty JSON.",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="JSONL file of {\"endpoint\", \"body\"} records to send, or - for stdin.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Parallel keep-alive connections in batch mode (default: {DEFAULT_CONCURRENCY}).",
+    )
+    parser.add_argument(
+        "--order",
+        choices=["input", "completion"],
+        default="input",
+        help="Write batch results in input order (default) or as they complete.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Neither read nor write the response cache.",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Skip cached responses but store the fresh ones.",
+    )
+    parser.add_argument(
+        "--qps",
+        type=float,
+        help=f"Requests per second shared by all ALAPI processes on this host; 0 disables (default: ALAPI_QPS or {DEFAULT_QPS:g}).",
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=DEFAULT_MAX_RETRIES,
+        help=f"Retries of 429 and 5xx responses, with exponential backoff (default: {DEFAULT_MAX_RETRIES}).",
+    )
+    parser.add_argument(
+        "--quota",
+        type=int,
+        help="Usage units available per quota period; calls stop once they are used (default: ALAPI_QUOTA, none).",
+    )
+    parser.add_argument(
+        "--quota-period",
+        choices=sorted(QuotaLedger.PERIODS),
+        help="Period the quota applies to (default: ALAPI_QUOTA_PERIOD or day).",
+    )
+    parser.add_argument(
+        "--usage",
+        action="store_true",
+        help="Print the locally counted usage and remaining quota, then exit.",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run as a daemon on --socket that serves --daemon calls from other processes.",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        default=os.environ.get("ALAPI_DAEMON") == "1",
+        help="Send calls through the --serve daemon; falls back to direct calls if none is running (default: ALAPI_DAEMON=1).",
+    )
+    parser.add_argument(
+        "--socket",
+        type=Path,
+        help="Unix socket of the daemon (default: ALAPI_DAEMON_SOCKET or daemon.sock in the cache directory).",
+    )
+    parser.add_argument(
+        "--cache-policy",
+        type=Path,
+        help="JSON file of per-endpoint cache TTLs (default: ALAPI_CACHE_POLICY or the bundled cache_policy.json).",
+    )
+    # Set once every argument exists, so an invalid value prints the full usage.
+    parser.set_defaults(
+        qps=_env_default(parser, "ALAPI_QPS", float, DEFAULT_QPS),
+        quota=_env_default(parser, "ALAPI_QUOTA", int, None),
+        quota_period=_env_default(parser, "ALAPI_QUOTA_PERIOD", str, "day", sorted(QuotaLedger.PERIODS)),
+    )
+    args = parser.parse_args()
+    if not args.batch and not args.endpoint and not args.usage and not args.serve:
+        parser.error("an endpoint is required unless --batch, --usage or --serve is given")
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.qps < 0 or args.max_retries < 0:
+        parser.error("--qps and --max-retries must not be negative")
+    args.daemon_ignored = [
+        "--" + dest.replace("_", "-")
+        for dest in DAEMON_SETTINGS
+        if getattr(args, dest) != parser.get_default(dest)
+    ]
+    return args
 
 
 def load_body(args: argparse.Namespace) -> dict | list:
@@ -57,46 +226,798 @@ def normalize_endpoint(endpoint: str) -> str:
     return endpoint
 
 
-def main() -> int:
-    args = parse_args()
-    endpoint = normalize_endpoint(args.endpoint)
-    token = args.token or os.environ.get("ALAPI_TOKEN")
-    if not token:
-        print(
-            "ALAPI_TOKEN is not set. Apply for one at https://apifox.com/apihub/ and export it first.",
-            file=sys.stderr,
+@dataclass
+class AlapiResponse:
+    status: int
+    text: str
+    cached: bool = False
+    attempts: int = 1
+    retry_after: float | None = None
+    shared: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+    @property
+    def succeeded(self) -> bool:
+        """A 2xx status and no ``"success": false`` in the body."""
+        if not self.ok:
+            return False
+        try:
+            parsed = self.json()
+        except json.JSONDecodeError:
+            return True
+        return not (isinstance(parsed, dict) and parsed.get("success") is False)
+
+    def json(self) -> dict | list:
+        return json.loads(self.text)
+
+    @property
+    def usage(self) -> int | None:
+        """Quota units the call consumed, from the response's ``usage`` field."""
+        try:
+            parsed = self.json()
+        except json.JSONDecodeError:
+            return None
+        usage = parsed.get("usage") if isinstance(parsed, dict) else None
+        return usage if isinstance(usage, int) and not isinstance(usage, bool) else None
+
+
+def canonical_body(body: dict | list | None) -> str:
+    """JSON text that is equal for equal bodies, whatever their key order."""
+    return json.dumps({} if body is None else body, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+def request_key(origin: str, endpoint: str, body: dict | list | None) -> str:
+    """Identity of a request for caching and coalescing: origin, endpoint and canonical body."""
+    return hashlib.sha256(f"{origin}{endpoint}\n{canonical_body(body)}".encode("utf-8")).hexdigest()
+
+
+def default_socket_path() -> Path:
+    if os.environ.get("ALAPI_DAEMON_SOCKET"):
+        return Path(os.environ["ALAPI_DAEMON_SOCKET"]).expanduser()
+    return default_cache_dir() / "daemon.sock"
+
+
+def default_cache_dir() -> Path:
+    if os.environ.get("ALAPI_CACHE_DIR"):
+        return Path(os.environ["ALAPI_CACHE_DIR"]).expanduser()
+    return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "alapi"
+
+
+@dataclass
+class CachePolicy:
+    """Cache lifetime per endpoint, in seconds; 0 means never cached.
+
+    ``ttl`` keys are endpoint paths or ``fnmatch`` patterns such as
+    ``/api/tianqi*``. An exact path wins, then the first matching pattern,
+    then ``default_ttl``.
+    """
+
+    default_ttl: float = 0
+    ttl: dict[str, float] = field(default_factory=dict)
+    max_bytes: int = DEFAULT_CACHE_MAX_BYTES
+
+    @classmethod
+    def load(cls, path: Path | None = None) -> CachePolicy:
+        path = path or Path(os.environ.get("ALAPI_CACHE_POLICY") or CACHE_POLICY_FILE)
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return cls(
+            default_ttl=float(data.get("default_ttl", 0)),
+            ttl={normalize_endpoint(pattern): float(seconds) for pattern, seconds in data.get("ttl", {}).items()},
+            max_bytes=int(data.get("max_bytes", DEFAULT_CACHE_MAX_BYTES)),
+        )
+
+    def ttl_for(self, endpoint: str) -> float:
+        if endpoint in self.ttl:
+            return self.ttl[endpoint]
+        for pattern, seconds in self.ttl.items():
+            if fnmatch.fnmatchcase(endpoint, pattern):
+                return seconds
+        return self.default_ttl
+
+
+class ResponseCache:
+    """On-disk cache of successful responses, keyed by origin, endpoint and canonical body.
+
+    Entries expire after their endpoint's TTL. When the stored responses
+    exceed ``policy.max_bytes``, the least recently used are evicted. The
+    SQLite file may be shared by threads and by concurrent processes.
+    """
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS responses (
+        key TEXT PRIMARY KEY,
+        endpoint TEXT NOT NULL,
+        status INTEGER NOT NULL,
+        text TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        expires REAL NOT NULL,
+        accessed REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+    """
+
+    def __init__(self, path: Path | None = None, policy: CachePolicy | None = None):
+        self.path = path or default_cache_dir() / "responses.sqlite"
+        self.policy = policy or CachePolicy.load()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Lookups such as IP or phone responses are personal data: only this
+        # user may read them. SQLite gives its -wal and -shm files the same mode.
+        umask = os.umask(0o177)
+        try:
+            self._conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(self._SCHEMA)
+        finally:
+            os.umask(umask)
+        os.chmod(self.path, 0o600)
+        self._lock = threading.Lock()
+        self._purge_uncacheable()
+
+    def __enter__(self) -> ResponseCache:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def get(self, origin: str, endpoint: str, body: dict | list | None) -> AlapiResponse | None:
+        """Return the unexpired cached response, if the endpoint is cacheable and one exists."""
+        if self.policy.ttl_for(endpoint) <= 0:
+            return None
+        key = request_key(origin, endpoint, body)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, text, expires FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[2] <= now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        return AlapiResponse(row[0], row[1], cached=True)
+
+    def put(self, origin: str, endpoint: str, body: dict | list | None, response: AlapiResponse) -> None:
+        """Store a successful response for its endpoint's TTL."""
+        ttl = self.policy.ttl_for(endpoint)
+        size = len(response.text.encode("utf-8"))
+        if ttl <= 0 or size > self.policy.max_bytes or not response.succeeded:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, endpoint, status, text, size, expires, accessed)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (request_key(origin, endpoint, body), endpoint, response.status, response.text, size, now + ttl, now),
+            )
+            self._evict(now)
+
+    def _purge_uncacheable(self) -> None:
+        """Delete responses of endpoints the current policy no longer caches."""
+        endpoints = [row[0] for row in self._conn.execute("SELECT DISTINCT endpoint FROM responses")]
+        stale = [(endpoint,) for endpoint in endpoints if self.policy.ttl_for(endpoint) <= 0]
+        if stale:
+            self._conn.executemany("DELETE FROM responses WHERE endpoint = ?", stale)
+
+    def _evict(self, now: float) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.policy.max_bytes:
+            return
+        self._conn.execute("DELETE FROM responses WHERE expires <= ?", (now,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        stale: list[str] = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed"):
+            if total <= self.policy.max_bytes:
+                break
+            stale.append(key)
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", [(key,) for key in stale])
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+_STATE_LOCK = threading.Lock()
+
+
+@contextmanager
+def locked_state(path: Path) -> Iterator[dict]:
+    """Read, update and write back a small JSON state file under an exclusive lock.
+
+    The lock is an ``flock`` on the file itself, so threads and processes
+    sharing the file take turns. The state is written back only if the
+    block completes.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _STATE_LOCK, path.open("a+", encoding="utf-8") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        handle.seek(0)
+        try:
+            state = json.loads(handle.read() or "{}")
+        except json.JSONDecodeError:
+            state = {}
+        yield state
+        handle.seek(0)
+        handle.truncate()
+        handle.write(json.dumps(state))
+        handle.flush()
+
+
+class RateLimiter:
+    """Token bucket of ``qps`` requests per second shared through a state file.
+
+    Every caller takes a token, and the bucket may go into debt: a caller
+    that finds no token reserves the next one and sleeps until it is due,
+    outside the lock. Concurrent threads and processes are therefore served
+    in turn at the configured rate, with bursts of up to ``burst`` requests.
+    """
+
+    def __init__(self, qps: float, burst: float | None = None, path: Path | None = None):
+        if qps <= 0:
+            raise ValueError("qps must be positive")
+        self.qps = qps
+        self.burst = burst or max(1.0, qps)
+        self.path = path or default_cache_dir() / "ratelimit.json"
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until it is due; returns the seconds slept."""
+        with locked_state(self.path) as state:
+            now = time.time()
+            elapsed = max(0.0, now - state.get("updated", now))
+            tokens = min(self.burst, state.get("tokens", self.burst) + elapsed * self.qps) - 1
+            state.update(tokens=tokens, updated=now)
+        delay = max(0.0, -tokens / self.qps)
+        if delay:
+            time.sleep(delay)
+        return delay
+
+
+class QuotaExhausted(Exception):
+    """The locally counted usage has reached the configured quota."""
+
+
+class QuotaLedger:
+    """Local count of the ``usage`` units that responses report, per day or month.
+
+    ALAPI reports what each call consumed, not what is left, so the remaining
+    quota is the configured ``quota`` minus the units counted in the current
+    period. Periods follow local time.
+    """
+
+    PERIODS = {"day": "%Y-%m-%d", "month": "%Y-%m"}
+    KEEP_PERIODS = 62
+
+    def __init__(self, quota: int | None = None, period: str = "day", path: Path | None = None):
+        if period not in self.PERIODS:
+            raise ValueError(f"Unknown quota period: {period}")
+        self.quota = quota
+        self.period = period
+        self.path = path or default_cache_dir() / f"usage-{period}.json"
+
+    def _label(self) -> str:
+        return datetime.now().strftime(self.PERIODS[self.period])
+
+    def record(self, units: int) -> None:
+        with locked_state(self.path) as state:
+            entry = state.setdefault(self._label(), {"calls": 0, "units": 0})
+            entry["calls"] += 1
+            entry["units"] += units
+            for label in sorted(state)[:-self.KEEP_PERIODS]:
+                del state[label]
+
+    def summary(self) -> dict:
+        """Calls and units counted in the current period, plus the remaining quota."""
+        with locked_state(self.path) as state:
+            entry = state.get(self._label(), {"calls": 0, "units": 0})
+        remaining = None if self.quota is None else max(0, self.quota - entry["units"])
+        return {"period": self._label(), **entry, "quota": self.quota, "remaining": remaining}
+
+    def check(self) -> None:
+        """Raise QuotaExhausted if the quota for the current period is used up."""
+        if self.quota is not None and self.summary()["remaining"] == 0:
+            raise QuotaExhausted(f"Local {self.period} quota of {self.quota} usage units is used up")
+
+
+def retry_delay(attempt: int, response: AlapiResponse) -> float:
+    """Seconds before retry ``attempt`` (0-based): ``Retry-After`` if given, else full-jitter backoff."""
+    if response.retry_after is not None:
+        return min(RETRY_MAX_SECONDS, response.retry_after)
+    return random.uniform(0, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** attempt))
+
+
+class AlapiError(Exception):
+    """A non-2xx HTTP response."""
+
+    def __init__(self, status: int, text: str):
+        super().__init__(f"HTTP {status}: {text}")
+        self.status = status
+        self.text = text
+
+
+class BaseClient:
+    """``call`` and context management on top of a subclass's ``request``."""
+
+    def request(self, endpoint: str, body: dict | list | None = None, *, refresh: bool = False) -> AlapiResponse:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def call(self, endpoint: str, body: dict | list | None = None, *, refresh: bool = False) -> dict | list:
+        """POST a JSON body and return the parsed response; raises AlapiError on a non-2xx status."""
+        response = self.request(endpoint, body, refresh=refresh)
+        if not response.ok:
+            raise AlapiError(response.status, response.text)
+        return response.json()
+
+
+class _Flight:
+    """One in-flight request that identical concurrent requests wait on."""
+
+    __slots__ = ("done", "response", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response: AlapiResponse | None = None
+        self.error: BaseException | None = None
+
+
+class AlapiClient(BaseClient):
+    """Reusable ALAPI caller with a pool of keep-alive connections to its host.
+
+    Safe to share between threads: each call takes an idle connection from
+    the pool, or opens one, and returns it once the response is read. Calls
+    in one session therefore share a few TCP/TLS handshakes instead of paying
+    one each. A pooled connection that the server has since closed is
+    replaced and the request resent once. Responses are requested gzipped
+    and decoded transparently.
+
+    With a ``limiter``, every attempt waits for a rate-limit token; 429 and
+    5xx responses are retried up to ``max_retries`` times. With a ``ledger``,
+    calls stop with QuotaExhausted once the local quota is used up, and each
+    response's ``usage`` is counted.
+
+    With ``coalesce`` (the default), a request identical to one already in
+    flight, by origin, endpoint and canonical body, waits for that call and
+    returns its response (with ``shared`` set) or raises its error.
+    """
+
+    def __init__(
+        self,
+        token: str | None = None,
+        *,
+        base_url: str = DEFAULT_BASE_URL,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_idle: int = DEFAULT_CONCURRENCY,
+        cache: ResponseCache | None = None,
+        limiter: RateLimiter | None = None,
+        ledger: QuotaLedger | None = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        coalesce: bool = True,
+    ):
+        """
+        Args:
+            token: ALAPI token (default: ALAPI_TOKEN)
+            base_url: Scheme, host and optional path prefix of the API
+            timeout: Socket timeout in seconds for connect and each read
+            max_idle: Idle connections kept open for reuse
+            cache: Response cache to read and fill (default: none)
+            limiter: Rate limiter every attempt waits on (default: none)
+            ledger: Quota ledger to check and count usage in (default: none)
+            max_retries: Retries of 429 and 5xx responses
+            coalesce: Share one call between identical concurrent requests
+        """
+        self.token = token or os.environ.get("ALAPI_TOKEN")
+        if not self.token:
+            raise ValueError("ALAPI_TOKEN is not set")
+        parts = urllib.parse.urlsplit(base_url)
+        if parts.scheme not in {"http", "https"} or not parts.netloc:
+            raise ValueError(f"Unsupported base URL: {base_url}")
+        self.scheme = parts.scheme
+        self.host = parts.netloc
+        self.path_prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.cache = cache
+        self.limiter = limiter
+        self.ledger = ledger
+        self.max_retries = max_retries
+        self.coalesce = coalesce
+        self.origin = f"{self.scheme}://{self.host}{self.path_prefix}"
+        self._idle: list[http.client.HTTPConnection] = []
+        self._inflight: dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.host, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, timeout=self.timeout)
+
+    def _acquire(self) -> tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return self._connect(), False
+
+    def _release(self, connection: http.client.HTTPConnection) -> None:
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+    def request(self, endpoint: str, body: dict | list | None = None, *, refresh: bool = False) -> AlapiResponse:
+        """POST a JSON body and return the response, whatever its status.
+
+        With a cache, an unexpired cached response is returned instead
+        (``cached`` is set), unless ``refresh`` is true; successful fresh
+        responses are stored either way. The returned response is the last
+        attempt; ``attempts`` counts them.
+        """
+        endpoint = normalize_endpoint(endpoint)
+        if self.cache is not None and not refresh:
+            cached = self.cache.get(self.origin, endpoint, body)
+            if cached is not None:
+                return cached
+        if not self.coalesce:
+            return self._fetch(endpoint, body)
+
+        key = request_key(self.origin, endpoint, body)
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return replace(flight.response, shared=True)
+
+        try:
+            flight.response = self._fetch(endpoint, body)
+            return flight.response
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            flight.done.set()
+
+    def _fetch(self, endpoint: str, body: dict | list | None) -> AlapiResponse:
+        if self.ledger is not None:
+            self.ledger.check()
+
+        for attempt in range(self.max_retries + 1):
+            if self.limiter is not None:
+                self.limiter.acquire()
+            response = self._send(endpoint, body)
+            response.attempts = attempt + 1
+            if self.ledger is not None and response.usage is not None:
+                self.ledger.record(response.usage)
+            if response.status != 429 and response.status < 500 or attempt == self.max_retries:
+                break
+            time.sleep(retry_delay(attempt, response))
+
+        if self.cache is not None:
+            self.cache.put(self.origin, endpoint, body, response)
+        return response
+
+    def _send(self, endpoint: str, body: dict | list | None) -> AlapiResponse:
+        payload = json.dumps({} if body is None else body, ensure_ascii=False).encode("utf-8")
+        path = f"{self.path_prefix}{endpoint}"
+        headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip",
+            "token": self.token,
+        }
+        connection, reused = self._acquire()
+        while True:
+            try:
+                connection.request("POST", path, body=payload, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+                break
+            except ConnectionError:
+                connection.close()
+                if not reused:
+                    raise
+                # The server closed this pooled connection while it sat idle.
+                connection, reused = self._connect(), False
+            except BaseException:
+                connection.close()
+                raise
+
+        if response.will_close:
+            connection.close()
+        else:
+            self._release(connection)
+        if (response.getheader("Content-Encoding") or "").lower() == "gzip":
+            data = gzip.decompress(data)
+        retry_after = response.getheader("Retry-After")
+        return AlapiResponse(
+            response.status,
+            data.decode("utf-8", errors="replace"),
+            retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None,
         )
+
+    def close(self) -> None:
+        """Close the idle connections; connections in use close when released."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self.max_idle = 0
+        for connection in idle:
+            connection.close()
+
+
+class DaemonClient(BaseClient):
+    """Send requests through an ``--serve`` daemon over its unix socket.
+
+    The daemon owns one ``AlapiClient``, so identical concurrent requests from
+    any process share one HTTP call, and all processes share its connection
+    pool, cache, rate limit and quota. The daemon's token and settings apply.
+    Each line on the socket carries one JSON request or reply.
+    """
+
+    ERRORS = {"quota": QuotaExhausted, "network": ConnectionError, "request": ValueError}
+
+    def __init__(self, socket_path: Path | None = None, *, timeout: float = DEFAULT_TIMEOUT, max_idle: int = DEFAULT_CONCURRENCY):
+        self.socket_path = socket_path or default_socket_path()
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._idle: list[tuple[socket.socket, io.BufferedRWPair]] = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> tuple[socket.socket, io.BufferedRWPair]:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(str(self.socket_path))
+        except OSError:
+            sock.close()
+            raise
+        return sock, sock.makefile("rwb")
+
+    def available(self) -> bool:
+        """True if a daemon accepts connections on the socket."""
+        try:
+            connection = self._connect()
+        except OSError:
+            return False
+        self._release(connection)
+        return True
+
+    def _release(self, connection: tuple[socket.socket, io.BufferedRWPair]) -> None:
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(connection)
+                return
+        self._discard(connection)
+
+    @staticmethod
+    def _discard(connection: tuple[socket.socket, io.BufferedRWPair]) -> None:
+        try:
+            # Closing flushes any unsent request; on a dead peer that fails.
+            connection[1].close()
+        except OSError:
+            pass
+        connection[0].close()
+
+    def request(self, endpoint: str, body: dict | list | None = None, *, refresh: bool = False) -> AlapiResponse:
+        message = json.dumps({"endpoint": endpoint, "body": body, "refresh": refresh}, ensure_ascii=False)
+        with self._lock:
+            connection, reused = (self._idle.pop(), True) if self._idle else (None, False)
+        if connection is None:
+            connection = self._connect()
+        while True:
+            try:
+                connection[1].write(message.encode("utf-8") + b"\n")
+                connection[1].flush()
+                line = connection[1].readline()
+                if not line:
+                    raise ConnectionResetError("The ALAPI daemon closed the connection")
+                break
+            except ConnectionError:
+                self._discard(connection)
+                if not reused:
+                    raise
+                # The daemon restarted since this connection was pooled.
+                connection, reused = self._connect(), False
+            except BaseException:
+                self._discard(connection)
+                raise
+
+        self._release(connection)
+        reply = json.loads(line)
+        if "error" in reply:
+            raise self.ERRORS.get(reply.get("kind"), RuntimeError)(reply["error"])
+        return AlapiResponse(**reply["response"])
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self.max_idle = 0
+        for connection in idle:
+            self._discard(connection)
+
+
+class _DaemonHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        client: AlapiClient = self.server.alapi_client
+        for line in self.rfile:
+            try:
+                message = json.loads(line)
+                response = client.request(message["endpoint"], message.get("body"), refresh=bool(message.get("refresh")))
+                reply = {"response": asdict(response)}
+            except QuotaExhausted as exc:
+                reply = {"error": str(exc), "kind": "quota"}
+            except (http.client.HTTPException, OSError) as exc:
+                reply = {"error": str(exc), "kind": "network"}
+            except (json.JSONDecodeError, KeyError, TypeError, AttributeError) as exc:
+                reply = {"error": f"Invalid daemon request: {exc}", "kind": "request"}
+            self.wfile.write(json.dumps(reply, ensure_ascii=False).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+def serve(socket_path: Path, client: AlapiClient) -> int:
+    """Serve ``DaemonClient`` requests on a unix socket until interrupted."""
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    if socket_path.exists():
+        if DaemonClient(socket_path).available():
+            print(f"An ALAPI daemon is already serving {socket_path}", file=sys.stderr)
+            return 1
+        socket_path.unlink()
+
+    # Only this user may spend the daemon's token.
+    umask = os.umask(0o177)
+    try:
+        server = socketserver.ThreadingUnixStreamServer(str(socket_path), _DaemonHandler)
+    finally:
+        os.umask(umask)
+    server.daemon_threads = True
+    server.alapi_client = client
+    # Exit through the cleanup below on SIGTERM too.
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print(f"Serving ALAPI calls on {socket_path}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        socket_path.unlink(missing_ok=True)
+    return 0
+
+
+def run_batch_record(client: BaseClient, index: int, line: str, refresh: bool = False) -> dict:
+    """Send one batch record and describe the outcome as a result dict."""
+    result: dict = {"index": index}
+    try:
+        record = json.loads(line)
+        if isinstance(record, dict) and "id" in record:
+            result["id"] = record["id"]
+        endpoint = normalize_endpoint(record["endpoint"])
+        body = record.get("body", {})
+    except (json.JSONDecodeError, KeyError, TypeError, AttributeError) as exc:
+        result.update(ok=False, status=None, error=f"Invalid batch record: {exc}")
+        return result
+
+    result["endpoint"] = endpoint
+    started = time.perf_counter()
+    try:
+        response = client.request(endpoint, body, refresh=refresh)
+    except QuotaExhausted as exc:
+        result.update(ok=False, status=None, error=str(exc))
+        return result
+    except (http.client.HTTPException, OSError) as exc:
+        result.update(ok=False, status=None, error=f"Network error: {exc}")
+        return result
+    finally:
+        result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    try:
+        parsed = response.json()
+    except json.JSONDecodeError:
+        parsed = response.text
+    result.update(
+        ok=response.succeeded,
+        status=response.status,
+        cached=response.cached,
+        shared=response.shared,
+        attempts=response.attempts,
+        response=parsed,
+    )
+    return result
+
+
+def iter_batch_results(
+    lines: Iterable[str],
+    handle: Callable[[int, str], dict],
+    concurrency: int,
+    ordered: bool,
+) -> Iterator[dict]:
+    """Run ``handle`` over non-blank lines in a thread pool, yielding results as they are ready.
+
+    At most ``concurrency * BATCH_WINDOW_PER_WORKER`` records are in flight,
+    so arbitrarily long inputs stream through in constant memory.
+    """
+    window = concurrency * BATCH_WINDOW_PER_WORKER
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        queued: deque[Future] = deque()
+        running: set[Future] = set()
+
+        def ready() -> Iterator[dict]:
+            nonlocal running
+            if ordered:
+                yield queued.popleft().result()
+                return
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+        for index, line in enumerate(line for line in lines if line.strip()):
+            future = pool.submit(handle, index, line)
+            if ordered:
+                queued.append(future)
+            else:
+                running.add(future)
+            if len(queued) + len(running) >= window:
+                yield from ready()
+        while queued or running:
+            yield from ready()
+
+
+def run_batch(args: argparse.Namespace, client: BaseClient) -> int:
+    try:
+        source: TextIO = sys.stdin if args.batch == "-" else open(args.batch, encoding="utf-8")
+    except OSError as exc:
+        print(f"Cannot read batch input: {exc}", file=sys.stderr)
         return 2
+    failures = 0
+    with source:
+        results = iter_batch_results(
+            source,
+            lambda index, line: run_batch_record(client, index, line, args.refresh),
+            args.concurrency,
+            ordered=args.order == "input",
+        )
+        for result in results:
+            failures += not result["ok"]
+            print(json.dumps(result, ensure_ascii=False), flush=True)
+    return 1 if failures else 0
 
+
+def call_once(args: argparse.Namespace, client: BaseClient) -> int:
     try:
         body = load_body(args)
     except Exception as exc:
         print(f"Invalid JSON body: {exc}", file=sys.stderr)
         return 2
 
-    url = f"{args.base_url.rstrip('/')}{endpoint}"
-    payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
-    request = urllib.request.Request(
-        url,
-        data=payload,
-        method="POST",
-        headers={
-            "Content-Type": "application/json",
-            "Accept": "application/json",
-            "token": token,
-        },
-    )
-
     try:
-        with urllib.request.urlopen(request, timeout=args.timeout) as response:
-            response_body = response.read().decode("utf-8")
-    except urllib.error.HTTPError as exc:
-        body_text = exc.read().decode("utf-8", errors="replace")
-        print(f"HTTP {exc.code}: {body_text}", file=sys.stderr)
+        response = client.request(args.endpoint, body, refresh=args.refresh)
+    except QuotaExhausted as exc:
+        print(exc, file=sys.stderr)
         return 1
-    except urllib.error.URLError as exc:
+    except (http.client.HTTPException, OSError) as exc:
         print(f"Network error: {exc}", file=sys.stderr)
         return 1
+    if not response.ok:
+        print(f"HTTP {response.status}: {response.text}", file=sys.stderr)
+        return 1
+    response_body = response.text
 
     if args.raw:
         print(response_body)
@@ -112,5 +1033,71 @@ def main() -> int:
     return 0
 
 
+def run_calls(args: argparse.Namespace, client: BaseClient) -> int:
+    if args.batch:
+        return run_batch(args, client)
+    return call_once(args, client)
+
+
+def main() -> int:
+    args = parse_args()
+    ledger = QuotaLedger(args.quota, args.quota_period)
+    if args.usage:
+        print(json.dumps(ledger.summary(), ensure_ascii=False, indent=2))
+        return 0
+
+    if args.daemon and not args.serve:
+        daemon = DaemonClient(args.socket, timeout=args.timeout, max_idle=args.concurrency)
+        if daemon.available():
+            if args.daemon_ignored:
+                print(
+                    f"Ignoring {', '.join(args.daemon_ignored)} with --daemon; the daemon's settings apply.",
+                    file=sys.stderr,
+                )
+            with daemon:
+                return run_calls(args, daemon)
+        print(f"No ALAPI daemon on {daemon.socket_path}; calling directly.", file=sys.stderr)
+
+    token = args.token or os.environ.get("ALAPI_TOKEN")
+    if not token:
+        print(
+            "ALAPI_TOKEN is not set. Apply for one at https://apifox.com/apihub/ and export it first.",
+            file=sys.stderr,
+        )
+        return 2
+
+    cache = None
+    if not args.no_cache:
+        try:
+            cache = ResponseCache(policy=CachePolicy.load(args.cache_policy))
+        except (OSError, ValueError, sqlite3.Error) as exc:
+            print(f"Cannot open the response cache: {exc}", file=sys.stderr)
+            return 2
+
+    try:
+        client = AlapiClient(
+            token,
+            base_url=args.base_url,
+            timeout=args.timeout,
+            max_idle=args.concurrency,
+            cache=cache,
+            limiter=RateLimiter(args.qps) if args.qps else None,
+            ledger=ledger,
+            max_retries=args.max_retries,
+        )
+    except ValueError as exc:
+        print(exc, file=sys.stderr)
+        return 2
+
+    try:
+        with client:
+            if args.serve:
+                return serve(args.socket or default_socket_path(), client)
+            return run_calls(args, client)
+    finally:
+        if cache is not None:
+            cache.close()
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Asyncio front end for the week report recorder.
+
+``AsyncWeekReportRecorder`` never runs git on the event loop. Each sync is a
+short-lived child process, started with ``asyncio.create_subprocess_exec``,
+that runs this script: it reads one JSON request from stdin and records the
+events through the synchronous ``WeekReportRecorder``, which takes the clone
+lock like any other capturer. ``submit()`` returns immediately; a background
+task batches submitted events into one child (and one commit) at a time.
+"""
+
+import asyncio
+import json
+import logging
+import sys
+import uuid
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from capture_queue import CaptureQueue
+    from conversation_logger import (
+        MaterialEvent,
+        SyncStatusTracker,
+        WeekReportRecorder,
+        build_conversation_event,
+    )
+    from git_operations import create_git_manager
+except ImportError:  # pragma: no cover - script/package dual use
+    from .capture_queue import CaptureQueue
+    from .conversation_logger import (
+        MaterialEvent,
+        SyncStatusTracker,
+        WeekReportRecorder,
+        build_conversation_event,
+    )
+    from .git_operations import create_git_manager
+
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+_SCRIPT = Path(__file__).resolve()
+
+
+class AsyncWeekReportRecorder:
+    """
+    Capture materials from asyncio code without blocking the event loop.
+
+    ``await record_event(...)`` waits for the commit and push of one event.
+    ``submit(...)`` puts the event in a bounded in-memory buffer and returns at
+    once; a background task drains the buffer in batches of up to
+    ``batch_size``, one child process and one commit per batch. When the buffer
+    is full, ``submit`` spills the event to the durable write-ahead log instead
+    of waiting, and the next background sync drains that log too. A batch
+    whose sync fails is spilled the same way, so the next sync retries it.
+    Producers that would rather wait for room use ``await put(...)``.
+
+    Use as an async context manager, or call ``close()`` before the loop ends,
+    so buffered events are flushed.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_pending: int = 256,
+        batch_size: int = 64,
+        max_retries: int = 3,
+        timeout: float = 300.0,
+        env: Optional[Dict[str, str]] = None,
+        queue: Optional[CaptureQueue] = None,
+        local_path: Optional[str] = None,
+    ):
+        """
+        Args:
+            max_pending: Capacity of the in-memory buffer behind ``submit``
+            batch_size: Most events written by one background sync
+            max_retries: Push retries per sync, as for ``WeekReportRecorder``
+            timeout: Seconds before a sync child is killed
+            env: Environment for the child (default: this process's);
+                it must carry the WEEK_REPORT_* Git settings
+            queue: Write-ahead log that overflowing events spill to and
+                that the sync child drains (default: under ~/.week-report-repo)
+            local_path: Directory of the child's clone, as for ``GitManager``
+                (default: ~/.week-report-repo)
+        """
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.env = env
+        self.spill_queue = queue or CaptureQueue(SyncStatusTracker.ROOT)
+        self.local_path = local_path
+        self.spilled = 0
+        self.failed_batches = 0
+        self._pending: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._drain_spilled = False
+
+    async def __aenter__(self) -> "AsyncWeekReportRecorder":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def _buffer(self) -> asyncio.Queue:
+        # Created lazily so the queue binds to the running loop.
+        if self._pending is None:
+            self._pending = asyncio.Queue(maxsize=self.max_pending)
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.get_running_loop().create_task(self._drain())
+        return self._pending
+
+    async def _run_child(self, request: Dict[str, Any]) -> bool:
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, str(_SCRIPT),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+            env=self.env,
+        )
+        # The child must write to, and drain, the same queue this recorder spills to.
+        request = dict(request, queue_root=str(self.spill_queue.root), local_path=self.local_path)
+        payload = json.dumps(request, ensure_ascii=False).encode('utf-8')
+        try:
+            _, stderr = await asyncio.wait_for(process.communicate(payload), self.timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            logger.error("Capture sync timed out after %.0fs", self.timeout)
+            return False
+        except asyncio.CancelledError:
+            process.kill()
+            await process.wait()
+            raise
+
+        if process.returncode != 0:
+            tail = stderr.decode('utf-8', errors='replace').strip().splitlines()[-3:]
+            logger.warning("Capture sync exited with %d: %s", process.returncode, " | ".join(tail))
+            return False
+        return True
+
+    async def record_events(
+        self,
+        events: List[MaterialEvent],
+        *,
+        session_guid: Optional[str] = None,
+        session_start_date: Optional[str] = None,
+    ) -> bool:
+        """Write events, then pull/commit/push once, in a child process."""
+        return await self._run_child({
+            "events": [asdict(event) for event in events],
+            "session_guid": session_guid,
+            "session_start_date": session_start_date,
+            "max_retries": self.max_retries,
+        })
+
+    async def record_event(self, event: MaterialEvent, **kwargs) -> bool:
+        return await self.record_events([event], **kwargs)
+
+    async def record_conversation(self, user_message: str, assistant_response: str, **kwargs) -> bool:
+        """Capture one conversation; keyword arguments as for ``build_conversation_event``."""
+        return await self.record_event(build_conversation_event(user_message, assistant_response, **kwargs))
+
+    def submit(
+        self,
+        event: MaterialEvent,
+        *,
+        session_guid: Optional[str] = None,
+        session_start_date: Optional[str] = None,
+    ) -> bool:
+        """Buffer an event for a background sync and return without waiting.
+
+        Must be called from a running event loop. Returns False only if the
+        event had to be spilled and the spill failed.
+        """
+        item = (event, session_guid, session_start_date)
+        try:
+            self._buffer().put_nowait(item)
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        if not self._spill([event], session_guid, session_start_date):
+            return False
+        logger.warning("Capture buffer full (%d), spilled event to %s", self.max_pending, self.spill_queue.wal_file)
+        return True
+
+    def _spill(
+        self,
+        events: List[MaterialEvent],
+        session_guid: Optional[str],
+        session_start_date: Optional[str],
+    ) -> bool:
+        """Append events to the write-ahead log for the next background sync."""
+        # enqueue_event only writes the local write-ahead log, never git.
+        recorder = WeekReportRecorder(None, queue=self.spill_queue)
+        for event in events:
+            try:
+                recorder.enqueue_event(event, session_guid=session_guid, session_start_date=session_start_date)
+            except OSError as exc:
+                logger.error("Spilling capture failed: %s", exc)
+                return False
+            self.spilled += 1
+            self._drain_spilled = True
+        return True
+
+    async def put(
+        self,
+        event: MaterialEvent,
+        *,
+        session_guid: Optional[str] = None,
+        session_start_date: Optional[str] = None,
+    ) -> None:
+        """Buffer an event for a background sync, waiting while the buffer is full."""
+        await self._buffer().put((event, session_guid, session_start_date))
+
+    async def _drain(self) -> None:
+        pending = self._pending
+        while True:
+            batch = [await pending.get()]
+            while len(batch) < self.batch_size and not pending.empty():
+                batch.append(pending.get_nowait())
+            try:
+                for (session_guid, session_start_date), events in self._group(batch):
+                    # A fixed id lets the queue drain skip events a failed child did write.
+                    for event in events:
+                        event.metadata.setdefault("event_id", uuid.uuid4().hex[:16])
+                    drain_spilled, self._drain_spilled = self._drain_spilled, False
+                    try:
+                        success = await self._run_child({
+                            "events": [asdict(event) for event in events],
+                            "session_guid": session_guid,
+                            "session_start_date": session_start_date,
+                            "max_retries": self.max_retries,
+                            "drain_queue": drain_spilled,
+                        })
+                    except Exception as exc:  # pragma: no cover - keep draining
+                        logger.error("Background capture sync failed: %s", exc)
+                        success = False
+                    if not success:
+                        self._drain_spilled = self._drain_spilled or drain_spilled
+                        self.failed_batches += 1
+                        if self._spill(events, session_guid, session_start_date):
+                            logger.warning("Spilled %d capture(s) to %s for the next sync", len(events), self.spill_queue.wal_file)
+            finally:
+                for _ in batch:
+                    pending.task_done()
+
+    @staticmethod
+    def _group(batch: List[Tuple]) -> List[Tuple[Tuple, List[MaterialEvent]]]:
+        """Split a batch into runs that share a session, keeping submission order."""
+        groups: Dict[Tuple, List[MaterialEvent]] = {}
+        for event, session_guid, session_start_date in batch:
+            groups.setdefault((session_guid, session_start_date), []).append(event)
+        return list(groups.items())
+
+    async def flush(self) -> None:
+        """Wait until every submitted event has been through a sync attempt."""
+        if self._pending is not None:
+            await self._pending.join()
+
+    async def close(self) -> None:
+        """Flush buffered events and stop the background task."""
+        await self.flush()
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+
+def main() -> int:
+    """Child entry point: record the events of one JSON request read from stdin."""
+    request = json.load(sys.stdin)
+
+    git = create_git_manager(local_path=request.get("local_path"))
+    if not git:
+        logger.error("Missing Git environment variables for week report system")
+        return 1
+
+    queue_root = request.get("queue_root")
+    recorder = WeekReportRecorder(git, queue=CaptureQueue(Path(queue_root)) if queue_root else None)
+    max_retries = request.get("max_retries", 3)
+    events = [MaterialEvent(**record) for record in request.get("events", [])]
+    success = recorder.record_events(
+        events,
+        session_guid=request.get("session_guid"),
+        session_start_date=request.get("session_start_date"),
+        max_retries=max_retries,
+    )
+    if request.get("drain_queue"):
+        success = recorder.flush_queue(max_retries=max_retries, replay_failures=False) and success
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
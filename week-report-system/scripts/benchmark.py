@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the week report capture and load paths.
+
+Everything runs against a throwaway local bare repository, so no network or
+credentials are needed. Results are printed (and optionally written) as JSON;
+pass an earlier result file with ``--compare`` to see the change per metric.
+
+Usage:
+    python benchmark.py --output bench.json
+    python benchmark.py --sizes 10,1000,100000 --compare bench.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+try:
+    from capture_queue import CaptureQueue
+    from conversation_logger import (
+        MessageCompressor,
+        ResponseSummarizer,
+        SessionManager,
+        SyncStatusTracker,
+        WeekReportRecorder,
+        build_material_event,
+    )
+    from git_operations import GitManager
+    from stress_capture import create_local_remote
+    from week_archive import WeekArchive
+    from week_rollup import WeekRollup
+except ImportError:  # pragma: no cover - script/package dual use
+    from .capture_queue import CaptureQueue
+    from .conversation_logger import (
+        MessageCompressor,
+        ResponseSummarizer,
+        SessionManager,
+        SyncStatusTracker,
+        WeekReportRecorder,
+        build_material_event,
+    )
+    from .git_operations import GitManager
+    from .stress_capture import create_local_remote
+    from .week_archive import WeekArchive
+    from .week_rollup import WeekRollup
+
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+RESULT_VERSION = 1
+SYNTHETIC_YEAR = 2001
+EVENTS_PER_FILE = 500
+_WORDS = (
+    "tflite xtensa kernel latency quantize fused conv pointwise buffer arena profile hotword "
+    "model dataset eval recall precision firmware flash driver dma cache refactor parser config "
+    "release benchmark regression fix review deploy rollout 模型 推理 量化 排查 对齐 性能 回归 修复"
+).split()
+_HINTS = ["please", "need to", "debug", "fix", "error", "帮我", "需要", "排查"]
+_CJK_WORDS = [word for word in _WORDS if not word.isascii()] + ["我们", "发现", "问题", "已经", "通过", "测试"]
+# Longest time one extractive summary of a 50 KB response may take.
+SUMMARY_BUDGET_SECONDS = 0.020
+
+
+def _sentence(rng: random.Random, length: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(length))
+
+
+def _cjk_sentence(rng: random.Random, length: int) -> str:
+    return "".join(rng.choice(_CJK_WORDS) for _ in range(length))
+
+
+def _latency_stats(samples: Sequence[float]) -> Dict[str, float]:
+    """Millisecond percentiles of a list of durations in seconds."""
+    ordered = sorted(samples)
+
+    def percentile(fraction: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(percentile(0.50) * 1000, 3),
+        "p90_ms": round(percentile(0.90) * 1000, 3),
+        "p99_ms": round(percentile(0.99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def _timed(fn: Callable[[], Any]) -> Tuple[Any, float]:
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def _peak_memory(fn: Callable[[], Any]) -> int:
+    """Peak Python heap allocated while running ``fn`` (separate pass; tracing slows it down)."""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _synthetic_record(rng: random.Random, number: int, ts: datetime) -> Dict[str, Any]:
+    return {
+        "timestamp": ts.isoformat(timespec='seconds'),
+        "source_type": rng.choice(["conversation", "conversation", "document", "repo_activity"]),
+        "title": f"{_sentence(rng, 4)} #{number}",
+        "summary": _sentence(rng, 30),
+        "project": f"project-{rng.randrange(8)}",
+        "evidence": [f"commit:{rng.getrandbits(28):07x}"],
+        "tags": rng.sample(["debug", "perf", "docs", "release", "infra", "model"], 2),
+        "outcome": _sentence(rng, 12),
+        "next_actions": [_sentence(rng, 6)],
+        "content": "",
+        # Captures store their SimHash; random ones keep generation fast.
+        "metadata": {"event_id": f"{rng.getrandbits(64):016x}", "simhash": f"{rng.getrandbits(64):016x}"},
+    }
+
+
+def generate_week(week_dir: Path, size: int, rng: random.Random) -> None:
+    """Write ``size`` synthetic materials into a week directory, 500 per file."""
+    materials_dir = week_dir / "materials"
+    materials_dir.mkdir(parents=True, exist_ok=True)
+    year, week = int(week_dir.parent.name), int(week_dir.name[len("week"):])
+    monday = datetime.fromisocalendar(year, week, 1)
+    step = timedelta(seconds=7 * 86400 / max(size, 1))
+    for start in range(0, size, EVENTS_PER_FILE):
+        path = materials_dir / f"{monday:%Y%m%d}-{start // EVENTS_PER_FILE:08x}.jsonl"
+        with path.open('w', encoding='utf-8') as handle:
+            for number in range(start, min(size, start + EVENTS_PER_FILE)):
+                record = _synthetic_record(rng, number, monday + step * number)
+                handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def bench_capture(recorder: WeekReportRecorder, count: int, rng: random.Random) -> Dict[str, Any]:
+    """Sequential record_event calls, each a full write + commit + push."""
+    latencies: List[float] = []
+    failures = 0
+    for number in range(count):
+        event = build_material_event(
+            "conversation",
+            f"{_sentence(rng, 4)} #{number}",
+            _sentence(rng, 30),
+            project=f"project-{number % 4}",
+            outcome=_sentence(rng, 12),
+        )
+        ok, elapsed = _timed(lambda: recorder.record_event(event, session_guid="benchmark"))
+        latencies.append(elapsed)
+        failures += int(not ok)
+    return {**_latency_stats(latencies), "failures": failures, "captures_per_s": round(count / sum(latencies), 2)}
+
+
+def bench_load(recorder: WeekReportRecorder, sizes: Sequence[int], rng: random.Random, repeat: int) -> Dict[str, Any]:
+    """load_week_materials and rollup rebuilds over synthetic weeks, live and compacted."""
+    results: Dict[str, Any] = {}
+    repo_dir = Path(recorder.git.repo_path)
+    for week, size in enumerate(sizes, start=1):
+        week_dir = repo_dir / str(SYNTHETIC_YEAR) / f"week{week:02d}"
+        generate_week(week_dir, size, rng)
+        entry: Dict[str, Any] = {"materials": size}
+        for layout in ("live", "archived"):
+            if layout == "archived":
+                entry["archive_bytes"] = WeekArchive.compact(week_dir, codec="gzip")["bytes_after"]
+            else:
+                entry["live_bytes"] = sum(path.stat().st_size for path in WeekArchive.live_files(week_dir))
+
+            load = lambda: recorder.load_week_materials(SYNTHETIC_YEAR, week)  # noqa: E731
+            loaded, _ = _timed(load)
+            assert len(loaded) == size, (len(loaded), size)
+            seconds = min(_timed(load)[1] for _ in range(repeat))
+            rollup_seconds = min(_timed(lambda: WeekRollup.build(week_dir))[1] for _ in range(repeat))
+            entry[layout] = {
+                "load_s": round(seconds, 4),
+                "load_events_per_s": round(size / seconds) if seconds else None,
+                "load_peak_bytes": _peak_memory(load),
+                "rollup_build_s": round(rollup_seconds, 4),
+            }
+        results[str(size)] = entry
+    return results
+
+
+def bench_range(recorder: WeekReportRecorder, per_week: int, rng: random.Random, repeat: int) -> Dict[str, Any]:
+    """load_materials_range over a synthetic year, one in four weeks compacted."""
+    repo_dir = Path(recorder.git.repo_path)
+    year = SYNTHETIC_YEAR + 1
+    for week in range(1, 53):
+        week_dir = repo_dir / str(year) / f"week{week:02d}"
+        generate_week(week_dir, per_week, rng)
+        if week % 4 == 0:
+            WeekArchive.compact(week_dir, codec="gzip")
+
+    start, end = datetime.fromisocalendar(year, 1, 1).date(), datetime.fromisocalendar(year, 52, 7).date()
+    load = lambda: sum(1 for _ in recorder.load_materials_range(start, end))  # noqa: E731
+    loaded, _ = _timed(load)
+    assert loaded == 52 * per_week, (loaded, 52 * per_week)
+    seconds = min(_timed(load)[1] for _ in range(repeat))
+    return {
+        "materials": loaded,
+        "year_s": round(seconds, 4),
+        "events_per_s": round(loaded / seconds) if seconds else None,
+        "peak_bytes": _peak_memory(load),
+    }
+
+
+def bench_compress(sizes_kb: Sequence[int], rng: random.Random, repeat: int) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for size_kb in sizes_kb:
+        lines: List[str] = []
+        total = 0
+        while total < size_kb * 1024:
+            line = _sentence(rng, 12)
+            if rng.random() < 0.05:
+                line = f"{rng.choice(_HINTS)} {line}"
+            lines.append(line)
+            total += len(line) + 1
+        message = "\n".join(lines)
+        seconds = min(_timed(lambda: MessageCompressor.compress(message))[1] for _ in range(repeat))
+        results[f"{size_kb}kb"] = {
+            "compress_s": round(seconds, 5),
+            "mb_per_s": round(len(message.encode('utf-8')) / seconds / 1e6, 2) if seconds else None,
+            "peak_bytes": _peak_memory(lambda: MessageCompressor.compress(message)),
+        }
+    return results
+
+
+def bench_summarize(count: int, rng: random.Random) -> Dict[str, Any]:
+    responses = []
+    for _ in range(count):
+        paragraphs = [f"{_sentence(rng, 20)}。{_sentence(rng, 15)}! {_sentence(rng, 10)}?" for _ in range(rng.randint(2, 12))]
+        if rng.random() < 0.3:
+            paragraphs.insert(1, f"```python\n{_sentence(rng, 40)}\n```")
+        responses.append("\n\n".join(paragraphs))
+    long_paragraphs: List[str] = []
+    while sum(len(paragraph) + 2 for paragraph in long_paragraphs) < 50 * 1024:
+        long_paragraphs.append(f"{_sentence(rng, 20)}. {_sentence(rng, 15)}. {_sentence(rng, 10)}.")
+    long_response = "\n\n".join(long_paragraphs)
+    # Dense CJK sentences between latin ones: the costliest text to tokenize.
+    mixed_paragraphs: List[str] = []
+    while sum(len(paragraph) + 2 for paragraph in mixed_paragraphs) < 50 * 1024:
+        mixed_paragraphs.append(f"{_cjk_sentence(rng, 12)}，{_cjk_sentence(rng, 8)}。{_sentence(rng, 15)}. {_cjk_sentence(rng, 10)}！")
+    mixed_response = "\n\n".join(mixed_paragraphs)
+
+    results: Dict[str, Any] = {}
+    for strategy in ResponseSummarizer.STRATEGIES:
+        latencies = [_timed(lambda: ResponseSummarizer.summarize(response, strategy))[1] for response in responses]
+        long_seconds = min(_timed(lambda: ResponseSummarizer.summarize(long_response, strategy))[1] for _ in range(5))
+        mixed_seconds = min(_timed(lambda: ResponseSummarizer.summarize(mixed_response, strategy))[1] for _ in range(5))
+        results[strategy] = {
+            **_latency_stats(latencies),
+            "ops_per_s": round(count / sum(latencies)),
+            "50kb_s": round(long_seconds, 5),
+            "50kb_mixed_s": round(mixed_seconds, 5),
+        }
+    return results
+
+
+def summary_budget_failures(results: Dict[str, Any]) -> List[str]:
+    """Describe every 50 KB summary that took longer than SUMMARY_BUDGET_SECONDS."""
+    failures = []
+    for strategy, metrics in results.get("summarize", {}).items():
+        for key in ("50kb_s", "50kb_mixed_s"):
+            if metrics[key] > SUMMARY_BUDGET_SECONDS:
+                failures.append(f"summarize.{strategy}.{key}: {metrics[key] * 1000:.1f} ms > {SUMMARY_BUDGET_SECONDS * 1000:.0f} ms")
+    return failures
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Describe the relative change of every numeric metric present in both results."""
+    lines: List[str] = []
+
+    def walk(now: Any, before: Any, path: str) -> None:
+        if isinstance(now, dict) and isinstance(before, dict):
+            for key in now:
+                if key in before:
+                    walk(now[key], before[key], f"{path}.{key}" if path else key)
+        elif isinstance(now, (int, float)) and isinstance(before, (int, float)) and not isinstance(now, bool):
+            if before:
+                lines.append(f"{path}: {before} -> {now} ({(now - before) / before * 100:+.1f}%)")
+
+    walk(current.get("results", {}), baseline.get("results", {}), "")
+    return lines
+
+
+def _code_version() -> str:
+    result = subprocess.run(
+        ['git', 'describe', '--always', '--dirty'],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+    )
+    return result.stdout.strip() or "unknown"
+
+
+def run(args: argparse.Namespace, workdir: str) -> Dict[str, Any]:
+    def rng(name: str) -> random.Random:
+        # Separate streams keep inputs identical when running a subset with --only.
+        return random.Random(f"{args.seed}:{name}")
+
+    for module in (WeekReportRecorder.__module__, GitManager.__module__):
+        logging.getLogger(module).setLevel(logging.WARNING)
+
+    # Keep status files and the session id out of the user's real ones.
+    SyncStatusTracker.ROOT = Path(workdir) / "state"
+    SyncStatusTracker.STATUS_FILE = SyncStatusTracker.ROOT / "last_sync_status.json"
+    SyncStatusTracker.QUEUE_FILE = SyncStatusTracker.ROOT / "local_queue.jsonl"
+    SessionManager.SESSION_FILE = os.path.join(workdir, "session.txt")
+    SessionManager.SESSION_DATE_FILE = os.path.join(workdir, "session_date.txt")
+    SessionManager.LOCK_FILE = os.path.join(workdir, "session.lock")
+
+    git = GitManager(
+        "benchmark", "", "benchmark/week-reports",
+        local_path=os.path.join(workdir, "clones"),
+        backend=args.backend,
+        remote_url=create_local_remote(workdir),
+    )
+    recorder = WeekReportRecorder(git, queue=CaptureQueue(SyncStatusTracker.ROOT))
+    if not git.pull():
+        raise RuntimeError("Could not clone the benchmark remote")
+
+    results: Dict[str, Any] = {}
+    if "capture" in args.only:
+        logger.info("Benchmarking capture (%d events)", args.captures)
+        results["capture"] = bench_capture(recorder, args.captures, rng("capture"))
+    if "load" in args.only:
+        logger.info("Benchmarking load (%s materials)", ", ".join(map(str, args.sizes)))
+        results["load"] = bench_load(recorder, args.sizes, rng("load"), args.repeat)
+    if "range" in args.only:
+        logger.info("Benchmarking load_materials_range (52 weeks of %d materials)", args.range_per_week)
+        results["range"] = bench_range(recorder, args.range_per_week, rng("range"), args.repeat)
+    if "compress" in args.only:
+        logger.info("Benchmarking MessageCompressor.compress")
+        results["compress"] = bench_compress(args.compress_kb, rng("compress"), args.repeat)
+    if "summarize" in args.only:
+        logger.info("Benchmarking ResponseSummarizer.summarize")
+        results["summarize"] = bench_summarize(args.summaries, rng("summarize"))
+
+    return {
+        "version": RESULT_VERSION,
+        "code_version": _code_version(),
+        "created_at": datetime.now().isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "git_backend": git.backend.name,
+        "parameters": {
+            "captures": args.captures,
+            "sizes": args.sizes,
+            "range_per_week": args.range_per_week,
+            "compress_kb": args.compress_kb,
+            "summaries": args.summaries,
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark week report capture and load paths.")
+    parser.add_argument("--captures", type=int, default=50, help="record_event calls to time (default: 50)")
+    parser.add_argument("--sizes", type=_int_list, default=[10, 1000, 10000, 100000],
+                        help="Comma-separated synthetic week sizes (default: 10,1000,10000,100000)")
+    parser.add_argument("--range-per-week", type=int, default=1000,
+                        help="Materials per week of the synthetic year for load_materials_range (default: 1000)")
+    parser.add_argument("--compress-kb", type=_int_list, default=[1, 100, 1024],
+                        help="Comma-separated message sizes for the compressor (default: 1,100,1024)")
+    parser.add_argument("--summaries", type=int, default=2000, help="Responses to summarize (default: 2000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Best of N for throughput metrics (default: 3)")
+    parser.add_argument("--only", type=lambda value: value.split(","), default=["capture", "load", "range", "compress", "summarize"],
+                        help="Comma-separated subset of capture,load,range,compress,summarize")
+    parser.add_argument("--backend", choices=["auto", "subprocess", "dulwich"], default="auto")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON result to this file")
+    parser.add_argument("--compare", help="Earlier JSON result to compare against")
+    parser.add_argument("--workdir", help="Directory for the remote and clone (default: a temp dir)")
+    parser.add_argument("--keep", action="store_true", help="Keep the work directory afterwards")
+    return parser
+
+
+def main() -> int:
+    args = _build_parser().parse_args()
+    workdir = args.workdir or tempfile.mkdtemp(prefix="week-report-bench-")
+    os.makedirs(workdir, exist_ok=True)
+    for key, value in (("GIT_AUTHOR_NAME", "benchmark"), ("GIT_AUTHOR_EMAIL", "benchmark@localhost")):
+        os.environ.setdefault(key, value)
+        os.environ.setdefault(key.replace("AUTHOR", "COMMITTER"), value)
+
+    try:
+        result = run(args, workdir)
+    finally:
+        if args.keep:
+            logger.info(f"Kept work directory {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding='utf-8')
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding='utf-8'))
+        print(f"\nCompared with {args.compare} ({baseline.get('code_version', 'unknown')}):", file=sys.stderr)
+        for line in compare(result, baseline):
+            print(f"  {line}", file=sys.stderr)
+    failures = summary_budget_failures(result["results"])
+    for line in failures:
+        logger.error("Over budget: %s", line)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
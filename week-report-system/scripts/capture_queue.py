@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Local write-ahead log for material capture.
+
+Captures are appended (and fsynced) to ``capture_wal.jsonl`` under
+``~/.week-report-repo`` so the agent turn never waits on the network. The sync
+worker later claims the log, writes the events into the report repo and pushes
+them in one commit.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: claims are not told apart
+    fcntl = None
+
+try:
+    from git_operations import file_lock
+except ImportError:  # pragma: no cover - script/package dual use
+    from .git_operations import file_lock
+
+
+logger = logging.getLogger(__name__)
+
+
+def material_event_id(record: Dict[str, Any]) -> str:
+    """Return a stable id for a material record.
+
+    Queued events carry ``metadata.event_id``; older records fall back to a hash
+    of their canonical JSON so replays can still be matched against the repo.
+    """
+    event_id = (record.get("metadata") or {}).get("event_id")
+    if event_id:
+        return str(event_id)
+    canonical = json.dumps(record, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+class CaptureQueue:
+    """Append-only JSONL queue with an explicit claim/release drain protocol.
+
+    ``claim`` renames the live log to a draining file of its own
+    (``capture_wal.draining.<id>.jsonl``) and holds a lock on it, so concurrent
+    drainers never share a file. ``release`` deletes only the files of that
+    claim after a successful push. ``abandon``, or the drainer exiting, unlocks
+    them, and the next ``claim`` adopts every unlocked draining file, so a
+    crashed or failed drain is retried.
+    """
+
+    DRAINING_GLOB = "capture_wal.draining*.jsonl"
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root) if root else Path.home() / ".week-report-repo"
+        self.wal_file = self.root / "capture_wal.jsonl"
+        self.lock_file = self.root / "capture_wal.lock"
+        self._claimed: Dict[Path, TextIO] = {}
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """Hold the queue lock, which serializes appends, claims and releases."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with file_lock(str(self.lock_file)):
+            yield
+
+    @staticmethod
+    def _append_durably(path: Path, data: str) -> None:
+        fd = os.open(str(path), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, data.encode('utf-8'))
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _read_entries(path: Path) -> List[Dict[str, Any]]:
+        if not path.exists():
+            return []
+
+        entries: List[Dict[str, Any]] = []
+        with path.open('r', encoding='utf-8') as handle:
+            for line in handle:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-append; the event was never acknowledged.
+                    logger.warning("Skipping malformed queue line in %s", path)
+        return entries
+
+    def _write(self, entries: Iterable[Dict[str, Any]]) -> int:
+        """Append entries in one durable write; the caller holds the queue lock."""
+        queued_at = datetime.now().isoformat(timespec='seconds')
+        lines = [json.dumps({"queued_at": queued_at, **entry}, ensure_ascii=False) + "\n" for entry in entries]
+        if lines:
+            self._append_durably(self.wal_file, "".join(lines))
+        return len(lines)
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        """Durably append one queue entry."""
+        with self.locked():
+            self._write([entry])
+
+    def replay(self, source: Path, convert: Callable[[Dict[str, Any]], Iterable[Dict[str, Any]]]) -> int:
+        """Move the records of another JSONL log into the queue; return how many entries that made.
+
+        Writers of ``source`` hold ``<source>.lock`` while appending. The log is
+        renamed to ``<source>.replaying`` (merged into one left by an interrupted
+        replay), converted into entries under the queue lock, and deleted only
+        once they are in the write-ahead log.
+        """
+        replay_file = source.with_name(source.name + ".replaying")
+        with file_lock(str(source) + ".lock"), self.locked():
+            if source.exists():
+                if replay_file.exists():
+                    # A torn last line must not swallow the first merged one.
+                    self._append_durably(replay_file, "\n" + source.read_text(encoding='utf-8'))
+                    source.unlink()
+                else:
+                    source.replace(replay_file)
+            if not replay_file.exists():
+                return 0
+            replayed = self._write(entry for record in self._read_entries(replay_file) for entry in convert(record))
+            replay_file.unlink()
+        return replayed
+
+    def _draining_files(self) -> List[Path]:
+        return sorted(self.root.glob(self.DRAINING_GLOB))
+
+    def pending_count(self) -> int:
+        return sum(len(self._read_entries(path)) for path in [*self._draining_files(), self.wal_file])
+
+    def _hold(self, path: Path) -> bool:
+        """Lock a draining file for this claim; False if another drainer holds it."""
+        handle = path.open('a', encoding='utf-8')
+        if fcntl is not None:
+            try:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                handle.close()
+                return False
+        self._claimed[path] = handle
+        return True
+
+    def claim(self) -> List[Dict[str, Any]]:
+        """Claim the live log and every abandoned draining file; return their entries."""
+        if not self.root.exists():
+            return []
+
+        with self.locked():
+            if self.wal_file.exists():
+                draining_file = self.root / f"capture_wal.draining.{uuid.uuid4().hex[:12]}.jsonl"
+                self.wal_file.replace(draining_file)
+                self._hold(draining_file)
+            for path in self._draining_files():
+                if path not in self._claimed:
+                    self._hold(path)
+            # Oldest first, so entries keep their queue order across claims.
+            claimed = sorted(self._claimed, key=lambda path: path.stat().st_mtime)
+            return [entry for path in claimed for entry in self._read_entries(path)]
+
+    def release(self) -> None:
+        """Delete the claimed files after their entries have been pushed."""
+        with self.locked():
+            for path, handle in self._claimed.items():
+                if path.exists():
+                    path.unlink()
+                handle.close()
+            self._claimed.clear()
+
+    def abandon(self) -> None:
+        """Unlock the claimed files and keep them for the next claim."""
+        for handle in self._claimed.values():
+            handle.close()
+        self._claimed.clear()
@@ -7,20 +7,36 @@ human-readable digest for quick inspection and backward compatibility.
 """
 
 import argparse
+import io
 import json
 import logging
 import os
 import re
 import uuid
-from dataclasses import asdict, dataclass, field
-from datetime import datetime
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, fields
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
 
 try:
-    from git_operations import create_git_manager
+    from capture_queue import CaptureQueue, material_event_id
+    from extractive_summary import METHODS as EXTRACTIVE_METHODS, summarize as extractive_summarize
+    from git_operations import create_git_manager, file_lock
+    from material_index import MaterialIndex, TimeBound, time_key
+    from near_duplicates import event_fingerprint
+    from week_archive import WeekArchive, record_time
+    from week_rollup import WeekRollup
 except ImportError:  # pragma: no cover - script/package dual use
-    from .git_operations import create_git_manager
+    from .capture_queue import CaptureQueue, material_event_id
+    from .extractive_summary import METHODS as EXTRACTIVE_METHODS, summarize as extractive_summarize
+    from .git_operations import create_git_manager, file_lock
+    from .material_index import MaterialIndex, TimeBound, time_key
+    from .near_duplicates import event_fingerprint
+    from .week_archive import WeekArchive, record_time
+    from .week_rollup import WeekRollup
 
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -28,10 +44,15 @@ logger = logging.getLogger(__name__)
 
 
 class SessionManager:
-    """Manage a coarse-grained session id shared across one active chat session."""
+    """Manage a coarse-grained session id shared across one active chat session.
+
+    Read-then-create runs under ``LOCK_FILE`` and values are replaced
+    atomically, so concurrent capturers agree on a single id.
+    """
 
     SESSION_FILE = "/tmp/week_report_session.txt"
     SESSION_DATE_FILE = "/tmp/week_report_session_date.txt"
+    LOCK_FILE = "/tmp/week_report_session.lock"
     SESSION_TTL_SECONDS = 86400
 
     @classmethod
@@ -54,8 +75,10 @@ class SessionManager:
     @classmethod
     def _write_value(cls, path: str, value: str) -> None:
         try:
-            with open(path, 'w', encoding='utf-8') as handle:
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as handle:
                 handle.write(value)
+            os.replace(tmp_path, path)
         except Exception as exc:  # pragma: no cover - defensive
             logger.warning("Failed to write session file %s: %s", path, exc)
 
@@ -65,8 +88,12 @@ class SessionManager:
         if guid:
             return guid
 
-        guid = uuid.uuid4().hex[:8]
-        cls._write_value(cls.SESSION_FILE, guid)
+        with file_lock(cls.LOCK_FILE):
+            # Another process may have created it while we waited.
+            guid = cls._read_recent_value(cls.SESSION_FILE)
+            if not guid:
+                guid = uuid.uuid4().hex[:8]
+                cls._write_value(cls.SESSION_FILE, guid)
         return guid
 
     @classmethod
@@ -87,8 +114,71 @@ class SessionManager:
                 os.remove(path)
 
 
+class KeywordMatcher:
+    """Case-insensitive multi-substring matcher compiled once into a trie-shaped regex.
+
+    Phrases sharing a prefix share one branch of the pattern, so each input
+    position is tested against a prefix tree rather than every phrase in turn.
+    The scan cost stays flat as the phrase list grows. Input is lowercased once
+    instead of using ``re.IGNORECASE``, which is several times slower.
+    """
+
+    def __init__(self, phrases: Iterable[str]):
+        self.phrases = sorted({phrase.strip().lower() for phrase in phrases if phrase and phrase.strip()})
+        self._pattern = re.compile(self._trie_pattern(self.phrases)) if self.phrases else None
+
+    @classmethod
+    def _trie_pattern(cls, phrases: List[str]) -> str:
+        trie: Dict[str, Any] = {}
+        for phrase in phrases:
+            node = trie
+            for char in phrase:
+                node = node.setdefault(char, {})
+            node[""] = {}
+        return cls._node_pattern(trie)
+
+    @classmethod
+    def _node_pattern(cls, node: Dict[str, Any]) -> str:
+        if "" in node:
+            # Any phrase ending here is a match; longer continuations are not needed.
+            return ""
+        branches = [re.escape(char) + cls._node_pattern(child) for char, child in sorted(node.items())]
+        return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+    def search(self, text: str) -> Optional[str]:
+        """Return the first matched phrase (lowercased) or None."""
+        if self._pattern is None or not text:
+            return None
+        match = self._pattern.search(text.lower())
+        return match.group(0) if match else None
+
+    def matching_lines(self, text: str) -> Iterator[str]:
+        """Yield each line of ``text`` that contains a phrase, scanning the block once."""
+        if self._pattern is None:
+            return
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # Rare case folding that changes length; offsets no longer line up.
+            yield from (line for line in text.splitlines() if self.search(line))
+            return
+        position = 0
+        while True:
+            match = self._pattern.search(lowered, position)
+            if not match:
+                return
+            start = text.rfind("\n", 0, match.start()) + 1
+            end = text.find("\n", match.end())
+            end = len(text) if end == -1 else end
+            yield text[start:end]
+            position = end + 1
+
+
 class PrivacyFilter:
-    """Skip only for strong-sensitive phrases to reduce false positives."""
+    """Skip only for strong-sensitive phrases to reduce false positives.
+
+    Extra phrases are read from ``WEEK_REPORT_PRIVACY_PHRASES_FILE`` (default
+    ``~/.week-report-repo/privacy_phrases.txt``), one per line, ``#`` for comments.
+    """
 
     SKIP_PHRASES = [
         'password',
@@ -104,10 +194,61 @@ class PrivacyFilter:
         '私密',
     ]
 
+    _matcher: Optional[KeywordMatcher] = None
+
+    @staticmethod
+    def _phrases_file() -> Path:
+        configured = os.environ.get('WEEK_REPORT_PRIVACY_PHRASES_FILE')
+        return Path(configured).expanduser() if configured else Path.home() / ".week-report-repo" / "privacy_phrases.txt"
+
+    @classmethod
+    def load_extra_phrases(cls) -> List[str]:
+        path = cls._phrases_file()
+        if not path.exists():
+            return []
+        try:
+            lines = path.read_text(encoding='utf-8').splitlines()
+        except OSError as exc:  # pragma: no cover - defensive
+            logger.warning("Failed to read privacy phrases from %s: %s", path, exc)
+            return []
+        return [line.strip() for line in lines if line.strip() and not line.lstrip().startswith('#')]
+
+    @classmethod
+    def reload(cls, extra_phrases: Optional[List[str]] = None) -> None:
+        """Rebuild the matcher from built-in, configured and ``extra_phrases``."""
+        cls._matcher = KeywordMatcher([*cls.SKIP_PHRASES, *cls.load_extra_phrases(), *(extra_phrases or [])])
+
+    @classmethod
+    def match(cls, texts: List[str]) -> Optional[str]:
+        """Return the sensitive phrase found in ``texts``, if any."""
+        if cls._matcher is None:
+            cls.reload()
+        for text in texts:
+            phrase = cls._matcher.search(text)
+            if phrase:
+                return phrase
+        return None
+
     @classmethod
     def should_skip(cls, texts: List[str]) -> bool:
-        combined = "\n".join(text for text in texts if text).lower()
-        return any(phrase in combined for phrase in cls.SKIP_PHRASES)
+        return cls.match(texts) is not None
+
+
+PrivacyFilter.reload()
+
+
+def _resolve_strategy(owner, strategy: Optional[str]) -> str:
+    """Pick a summarizing strategy: the argument, else WEEK_REPORT_SUMMARY_STRATEGY, else the default.
+
+    The environment variable names an extractive method for both classes, so
+    values a class does not offer fall back to its default.
+    """
+    if strategy is None:
+        strategy = os.environ.get('WEEK_REPORT_SUMMARY_STRATEGY', '')
+        return strategy if strategy in owner.STRATEGIES else owner.DEFAULT_STRATEGY
+    if strategy not in owner.STRATEGIES:
+        raise ValueError(f"Unknown {owner.__name__} strategy: {strategy}")
+    return strategy
 
 
 class MessageCompressor:
@@ -115,51 +256,141 @@ class MessageCompressor:
 
     MAX_LENGTH = 500
 
+    INDICATORS = [
+        '需要', '要求', '请', '帮我', '如何', '怎么', '总结', '纳入', 'repo',
+        'plan', 'experiment', 'debug', 'issue', 'pr', 'commit',
+        'need', 'please', 'help', 'how', 'why', 'summary'
+    ]
+    _indicator_matcher = KeywordMatcher(INDICATORS)
+
+    # Longer physical lines are consumed in pieces of this size.
+    STREAM_CHUNK = 65536
+
+    # "keywords" keeps indicator lines; the others score sentences (extractive_summary).
+    STRATEGIES = ("keywords", *EXTRACTIVE_METHODS)
+    DEFAULT_STRATEGY = "keywords"
+
     @classmethod
-    def compress(cls, message: str) -> str:
+    def compress(cls, message: str, strategy: Optional[str] = None) -> str:
         if len(message) <= cls.MAX_LENGTH:
             return message.strip()
+        strategy = _resolve_strategy(cls, strategy)
+        if strategy != "keywords":
+            return extractive_summarize(message, cls.MAX_LENGTH, method=strategy)
+        # newline="" keeps "\r\n" in each line, so the length seen matches len(message).
+        return cls.compress_stream(io.StringIO(message, newline=""))
 
-        # Keep lines with obvious requests, outcomes, or constraints.
-        lines = [line.strip() for line in message.splitlines() if line.strip()]
-        indicators = [
-            '需要', '要求', '请', '帮我', '如何', '怎么', '总结', '纳入', 'repo',
-            'plan', 'experiment', 'debug', 'issue', 'pr', 'commit',
-            'need', 'please', 'help', 'how', 'why', 'summary'
-        ]
+    @classmethod
+    def compress_file(cls, handle: TextIO, strategy: Optional[str] = None) -> str:
+        """Compress a text stream (file or stdin).
+
+        The default strategy never reads the stream into memory; extractive
+        strategies need the whole text.
+        """
+        strategy = _resolve_strategy(cls, strategy)
+        if strategy != "keywords":
+            return cls.compress(handle.read(), strategy)
+        return cls.compress_stream(cls._candidate_lines(handle))
+
+    @classmethod
+    def _candidate_lines(cls, handle: TextIO) -> Iterator[str]:
+        """Yield lines from ``handle`` in ``STREAM_CHUNK`` blocks.
+
+        Every line is yielded until the head and fallback lines needed by
+        :meth:`compress_stream` are covered; after that only indicator lines are
+        yielded, found by one regex pass per block.
+        """
+        carry = ""
+        head_length = 0
+        non_empty = 0
+        while True:
+            chunk = handle.read(cls.STREAM_CHUNK)
+            block = carry + chunk
+            if not block:
+                return
+            cut = block.rfind("\n") + 1 if chunk else len(block)
+            if cut == 0:
+                # No newline in a whole chunk: split the overlong line here.
+                cut = len(block)
+            block, carry = block[:cut], block[cut:]
+
+            if head_length <= cls.MAX_LENGTH or non_empty < 5:
+                for line in block.splitlines(keepends=True):
+                    head_length += len(line)
+                    non_empty += bool(line.strip())
+                    yield line
+            else:
+                yield from cls._indicator_matcher.matching_lines(block)
 
+    @classmethod
+    def compress_stream(cls, lines: Iterable[str]) -> str:
+        """Compress text given as an iterable of lines using bounded memory.
+
+        Only the first ``MAX_LENGTH`` characters, up to five fallback lines and the
+        selected indicator lines are retained. Reading stops as soon as enough
+        indicator lines have been collected.
+        """
+        head: List[str] = []
+        head_length = 0
+        fallback: List[str] = []
         selected: List[str] = []
-        for line in lines:
-            lowered = line.lower()
-            if any(indicator in lowered for indicator in indicators):
+        selected_length = 0
+
+        for raw in lines:
+            if head_length <= cls.MAX_LENGTH:
+                piece = raw[:cls.MAX_LENGTH + 1 - head_length]
+                head.append(piece)
+                head_length += len(piece)
+
+            # Keep lines with obvious requests, outcomes, or constraints.
+            line = raw.strip()
+            if not line:
+                continue
+            if len(fallback) < 5:
+                fallback.append(line[:cls.MAX_LENGTH])
+            if cls._indicator_matcher.search(line):
                 selected.append(line)
-            if len(" ".join(selected)) >= cls.MAX_LENGTH:
+                selected_length += len(line) + 1
+            if selected_length > cls.MAX_LENGTH:
                 break
 
-        compressed = " ".join(selected) if selected else " ".join(lines[:5])
+        head_text = "".join(head)
+        if head_length <= cls.MAX_LENGTH:
+            return head_text.strip()
+
+        compressed = " ".join(selected) if selected else " ".join(fallback)
         compressed = re.sub(r'\s+', ' ', compressed).strip()
 
         if len(compressed) > cls.MAX_LENGTH:
             compressed = compressed[:cls.MAX_LENGTH - 3] + "..."
 
-        return compressed or message[:cls.MAX_LENGTH - 3] + "..."
+        return compressed or head_text[:cls.MAX_LENGTH - 3] + "..."
 
 
 class ResponseSummarizer:
     """Condense an assistant response into a short outcome statement."""
 
     MAX_CHARS = 300
+    MAX_SENTENCES = 3
+
+    # "lead" keeps the first sentences; the others score sentences (extractive_summary).
+    STRATEGIES = ("lead", *EXTRACTIVE_METHODS)
+    DEFAULT_STRATEGY = "lead"
 
     @classmethod
-    def summarize(cls, response: str) -> str:
+    def summarize(cls, response: str, strategy: Optional[str] = None) -> str:
         text = re.sub(r'```.*?```', ' ', response, flags=re.S)
         text = re.sub(r'\s+', ' ', text).strip()
         if not text:
             return "AI provided assistance."
 
+        strategy = _resolve_strategy(cls, strategy)
+        if strategy != "lead" and len(text) > cls.MAX_CHARS:
+            return extractive_summarize(response, cls.MAX_CHARS, method=strategy, max_sentences=cls.MAX_SENTENCES)
+
         # Split conservatively and keep the first few meaningful fragments.
         fragments = [frag.strip() for frag in re.split(r'[。！？!?]\s*', text) if frag.strip()]
-        summary = "。".join(fragments[:3]).strip()
+        summary = "。".join(fragments[:cls.MAX_SENTENCES]).strip()
         if not summary:
             summary = text
         if len(summary) > cls.MAX_CHARS:
@@ -167,8 +398,31 @@ class ResponseSummarizer:
         return summary
 
 
+class _ParsedTimestamp:
+    """Slot for the cached parse of ``MaterialEvent.timestamp``; not a field, so never serialized."""
+
+    __slots__ = ("_parsed",)
+
+
+def _slotted(cls: type) -> type:
+    """Rebuild a dataclass with ``__slots__`` for its fields.
+
+    Same as ``dataclass(slots=True)``, which needs Python 3.10: slots cannot
+    be declared in the class body next to field defaults, so the class is
+    recreated without the default class attributes.
+    """
+    names = tuple(item.name for item in fields(cls))
+    namespace = {
+        key: value for key, value in cls.__dict__.items()
+        if key not in names and key not in ("__dict__", "__weakref__")
+    }
+    namespace["__slots__"] = names
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+@_slotted
 @dataclass
-class MaterialEvent:
+class MaterialEvent(_ParsedTimestamp):
     timestamp: str
     source_type: str
     title: str
@@ -184,9 +438,18 @@ class MaterialEvent:
     def to_json_line(self) -> str:
         return json.dumps(asdict(self), ensure_ascii=False) + "\n"
 
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "MaterialEvent":
+        """Rebuild an event from a stored JSONL record, ignoring unknown keys."""
+        return cls(**{name: record[name] for name in cls.__dataclass_fields__ if name in record})
+
     @property
     def dt(self) -> datetime:
-        return datetime.fromisoformat(self.timestamp)
+        """``timestamp`` as a datetime, parsed once per timestamp value."""
+        parsed = getattr(self, "_parsed", None)
+        if parsed is None or parsed[0] != self.timestamp:
+            parsed = self._parsed = (self.timestamp, datetime.fromisoformat(self.timestamp))
+        return parsed[1]
 
 
 class SyncStatusTracker:
@@ -219,7 +482,8 @@ class SyncStatusTracker:
             **payload,
         }
         cls.STATUS_FILE.write_text(json.dumps(status, ensure_ascii=False, indent=2) + "\n", encoding='utf-8')
-        with cls.QUEUE_FILE.open('a', encoding='utf-8') as handle:
+        # CaptureQueue.replay takes the same lock before moving the log away.
+        with file_lock(str(cls.QUEUE_FILE) + ".lock"), cls.QUEUE_FILE.open('a', encoding='utf-8') as handle:
             handle.write(json.dumps(status, ensure_ascii=False) + "\n")
 
 
@@ -231,6 +495,16 @@ class MaterialFormatter:
         week = ts.isocalendar()
         return f"{week[0]}/week{week[1]:02d}"
 
+    @staticmethod
+    def week_paths_between(start: date, end: date) -> List[str]:
+        """Return the ``{year}/weekWW`` path of every ISO week from ``start`` to ``end``, in order."""
+        monday = start - timedelta(days=start.weekday())
+        paths: List[str] = []
+        while monday <= end:
+            paths.append(MaterialFormatter.get_week_path(monday))
+            monday += timedelta(weeks=1)
+        return paths
+
     @staticmethod
     def material_path(ts: datetime, start_date: str, guid: str) -> str:
         week_path = MaterialFormatter.get_week_path(ts)
@@ -269,11 +543,95 @@ class MaterialFormatter:
         )
 
 
+class MaterialBatch:
+    """Events collected by :meth:`WeekReportRecorder.batch`."""
+
+    def __init__(self) -> None:
+        self.events: List[MaterialEvent] = []
+        self.success: Optional[bool] = None
+
+    def add(self, event: MaterialEvent) -> None:
+        self.events.append(event)
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+
 class WeekReportRecorder:
     """Capture structured materials and sync them to the Git-backed repository."""
 
-    def __init__(self, git_manager):
+    DUPLICATE_POLICIES = ("flag", "skip")
+    # Weeks parsed concurrently (and held ahead of the consumer) by load_materials_range.
+    RANGE_WORKERS = 4
+
+    def __init__(
+        self,
+        git_manager,
+        queue: Optional[CaptureQueue] = None,
+        duplicate_policy: Optional[str] = None,
+    ):
+        """
+        Args:
+            git_manager: GitManager for the report repository
+            queue: Local write-ahead queue (default: under ~/.week-report-repo)
+            duplicate_policy: What to do with near-duplicates of a material
+                already captured that week: "flag" records ``metadata.duplicate_of``
+                (default), "skip" drops the event. Defaults to
+                WEEK_REPORT_DUPLICATE_POLICY.
+        """
         self.git = git_manager
+        self.queue = queue or CaptureQueue(SyncStatusTracker.ROOT)
+        self.duplicate_policy = duplicate_policy or os.environ.get('WEEK_REPORT_DUPLICATE_POLICY', 'flag')
+        if self.duplicate_policy not in self.DUPLICATE_POLICIES:
+            raise ValueError(f"Unknown duplicate policy: {self.duplicate_policy}")
+
+    def _resolve_paths(
+        self,
+        event: MaterialEvent,
+        session_guid: Optional[str],
+        session_start_date: Optional[str],
+    ) -> Dict[str, str]:
+        guid = session_guid or SessionManager.get_or_create_guid()
+        start_date = session_start_date or SessionManager.get_or_create_start_date(event.dt)
+        return {
+            "guid": guid,
+            "material_path": MaterialFormatter.material_path(event.dt, start_date, guid),
+            "digest_path": MaterialFormatter.digest_path(event.dt, start_date, guid),
+            "week_path": MaterialFormatter.get_week_path(event.dt),
+        }
+
+    @staticmethod
+    def _invalid_timestamp(event: MaterialEvent) -> bool:
+        try:
+            event.dt
+        except (TypeError, ValueError) as exc:
+            logger.warning("Skipping material with an invalid timestamp %r: %s", event.timestamp, exc)
+            return True
+        return False
+
+    @staticmethod
+    def _privacy_skip(event: MaterialEvent) -> bool:
+        phrase = PrivacyFilter.match([event.title, event.summary, event.outcome, event.content])
+        if phrase is None:
+            return False
+        logger.info("Skipping material capture for privacy (matched %r)", phrase)
+        SyncStatusTracker.update_success({
+            "reason": "skipped_privacy",
+            "matched_phrase": phrase,
+            "source_type": event.source_type,
+            "title": event.title,
+        })
+        return True
+
+    def _write_event(self, event: MaterialEvent, paths: Dict[str, str]) -> None:
+        """Append one event to its JSONL and digest files without syncing."""
+        digest_path = paths["digest_path"]
+        digest_full_path = os.path.join(self.git.repo_path, digest_path)
+        if not os.path.exists(digest_full_path):
+            self.git.append_to_file(digest_path, MaterialFormatter.format_digest_header(paths["guid"], event.dt))
+
+        self.git.append_to_file(paths["material_path"], event.to_json_line())
+        self.git.append_to_file(digest_path, MaterialFormatter.format_digest_entry(event))
 
     def record_event(
         self,
@@ -283,65 +641,270 @@ class WeekReportRecorder:
         session_start_date: Optional[str] = None,
         max_retries: int = 3,
     ) -> bool:
-        if PrivacyFilter.should_skip([event.title, event.summary, event.outcome, event.content]):
-            logger.info("Skipping material capture for privacy")
-            SyncStatusTracker.update_success({
-                "reason": "skipped_privacy",
-                "source_type": event.source_type,
-                "title": event.title,
-            })
-            return True
-
-        guid = session_guid or SessionManager.get_or_create_guid()
-        start_date = session_start_date or SessionManager.get_or_create_start_date(event.dt)
-        material_path = MaterialFormatter.material_path(event.dt, start_date, guid)
-        digest_path = MaterialFormatter.digest_path(event.dt, start_date, guid)
-        week_path = MaterialFormatter.get_week_path(event.dt)
-
-        try:
-            self.git.pull()
-
-            digest_full_path = os.path.join(self.git.repo_path, digest_path)
-            if not os.path.exists(digest_full_path):
-                self.git.append_to_file(digest_path, MaterialFormatter.format_digest_header(guid, event.dt))
+        return self.record_events(
+            [event],
+            session_guid=session_guid,
+            session_start_date=session_start_date,
+            max_retries=max_retries,
+        )
 
-            self.git.append_to_file(material_path, event.to_json_line())
-            self.git.append_to_file(digest_path, MaterialFormatter.format_digest_entry(event))
+    def record_events(
+        self,
+        events: Iterable[MaterialEvent],
+        *,
+        session_guid: Optional[str] = None,
+        session_start_date: Optional[str] = None,
+        max_retries: int = 3,
+    ) -> bool:
+        """Write any number of events, then pull/commit/push exactly once.
+
+        Events whose timestamp does not parse are skipped with a warning, and
+        make the result False; the rest of the batch is still written.
+        """
+        accepted: List[MaterialEvent] = []
+        invalid = 0
+        for event in events:
+            if self._invalid_timestamp(event):
+                invalid += 1
+                continue
+            if self._privacy_skip(event):
+                continue
+            accepted.append(event)
+
+        if not accepted:
+            return not invalid
 
-            commit_message = f"Capture {event.source_type} {guid} [{week_path}]"
-            success = self.git.commit_and_push(commit_message, max_retries=max_retries)
+        guid = session_guid or SessionManager.get_or_create_guid()
+        resolved = [(event, self._resolve_paths(event, guid, session_start_date)) for event in accepted]
+        week_paths = sorted({paths["week_path"] for _, paths in resolved})
 
-            payload = {
+        if len(resolved) == 1:
+            event, paths = resolved[0]
+            payload: Dict[str, Any] = {
                 "source_type": event.source_type,
                 "project": event.project,
                 "title": event.title,
-                "guid": guid,
-                "week_path": week_path,
-                "material_path": material_path,
-                "digest_path": digest_path,
+                **paths,
             }
-            if success:
-                SyncStatusTracker.update_success(payload)
-                logger.info("Captured material: %s", material_path)
-            else:
-                SyncStatusTracker.update_failure({**payload, "error": "commit_or_push_failed"})
-                logger.warning("Failed to sync material after retries: %s", material_path)
-            return success
-        except Exception as exc:  # pragma: no cover - defensive
+            commit_message = f"Capture {event.source_type} {guid} [{paths['week_path']}]"
+        else:
             payload = {
-                "source_type": event.source_type,
-                "project": event.project,
-                "title": event.title,
+                "count": len(resolved),
                 "guid": guid,
-                "week_path": week_path,
-                "material_path": material_path,
-                "digest_path": digest_path,
-                "error": str(exc),
-                "event": asdict(event),
+                "week_paths": week_paths,
+                "material_paths": sorted({paths["material_path"] for _, paths in resolved}),
             }
-            SyncStatusTracker.update_failure(payload)
-            logger.error("Error capturing material: %s", exc)
+            commit_message = f"Capture {len(resolved)} materials {guid} [{', '.join(week_paths)}]"
+
+        return self._sync_resolved(resolved, commit_message, payload, max_retries=max_retries) and not invalid
+
+    def _sync_resolved(
+        self,
+        resolved: List[Tuple[MaterialEvent, Dict[str, str]]],
+        commit_message: str,
+        payload: Dict[str, Any],
+        *,
+        max_retries: int = 3,
+        skip_existing: bool = False,
+    ) -> bool:
+        """Pull once, append every resolved event, then commit and push once.
+
+        Runs under the clone lock, so concurrent capturers on this host each
+        see the previous one's rollup and commit in turn.
+        """
+        week_paths = sorted({paths["week_path"] for _, paths in resolved})
+        with self.git.tracing("capture") as trace, self.git.locked():
+            trace.fields["events"] = len(resolved)
+            try:
+                self.git.pull_if_stale()
+                for week_path in week_paths:
+                    self.git.ensure_week_available(week_path)
+
+                with self.git.timed("write"):
+                    rollups = {
+                        week_path: WeekRollup.load_current(Path(self.git.repo_path) / week_path)
+                        for week_path in week_paths
+                    }
+                    written = self._write_resolved(resolved, rollups, skip_existing)
+                    if written:
+                        for week_path, rollup in rollups.items():
+                            self.git.write_file(
+                                f"{week_path}/{WeekRollup.FILE_NAME}",
+                                rollup.to_json(Path(self.git.repo_path) / week_path),
+                            )
+                trace.fields["written"] = written
+
+                if not written:
+                    logger.info("Nothing new to capture into %s", ", ".join(week_paths))
+                    return True
+
+                success = self.git.commit_and_push(commit_message, max_retries=max_retries)
+                trace.fields["success"] = success
+
+                if success:
+                    SyncStatusTracker.update_success({**payload, "timings": trace.to_dict()})
+                    logger.info("Captured %d material(s) into %s", written, ", ".join(week_paths))
+                else:
+                    SyncStatusTracker.update_failure({
+                        **payload, "error": "commit_or_push_failed", "timings": trace.to_dict(),
+                    })
+                    logger.warning("Failed to sync %d material(s) after retries", len(resolved))
+                return success
+            except Exception as exc:  # pragma: no cover - defensive
+                trace.fields["success"] = False
+                failure = {**payload, "error": str(exc), "timings": trace.to_dict()}
+                if len(resolved) == 1:
+                    failure["event"] = asdict(resolved[0][0])
+                else:
+                    failure["events"] = [asdict(event) for event, _ in resolved]
+                SyncStatusTracker.update_failure(failure)
+                logger.error("Error capturing material: %s", exc)
+                return False
+
+    def _write_resolved(
+        self,
+        resolved: List[Tuple[MaterialEvent, Dict[str, str]]],
+        rollups: Dict[str, WeekRollup],
+        skip_existing: bool,
+    ) -> int:
+        """Append events to their files and rollups; return how many were written."""
+        known_ids: Dict[str, set] = {}
+        written = 0
+        for event, paths in resolved:
+            if skip_existing:
+                material_path = paths["material_path"]
+                if material_path not in known_ids:
+                    known_ids[material_path] = self._existing_event_ids(material_path)
+                event_id = material_event_id(asdict(event))
+                if event_id in known_ids[material_path]:
+                    continue
+                known_ids[material_path].add(event_id)
+            rollup = rollups[paths["week_path"]]
+            event.metadata.setdefault("event_id", uuid.uuid4().hex[:16])
+            event.metadata.setdefault("simhash", event_fingerprint(event.summary, event.outcome))
+            duplicate_of = rollup.find_duplicate(asdict(event))
+            if duplicate_of:
+                if self.duplicate_policy == "skip":
+                    logger.info("Skipping near-duplicate of %s: %s", duplicate_of, event.title)
+                    continue
+                event.metadata["duplicate_of"] = duplicate_of
+            self._write_event(event, paths)
+            rollup.add(asdict(event))
+            written += 1
+        return written
+
+    def _existing_event_ids(self, material_path: str) -> set:
+        content = self.git.read_file(material_path)
+        if not content:
+            return set()
+
+        ids = set()
+        for line in content.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                ids.add(material_event_id(json.loads(line)))
+            except json.JSONDecodeError:
+                continue
+        return ids
+
+    def enqueue_event(
+        self,
+        event: MaterialEvent,
+        *,
+        session_guid: Optional[str] = None,
+        session_start_date: Optional[str] = None,
+    ) -> bool:
+        """Durably queue an event locally and return without touching Git.
+
+        The session GUID and file date are resolved now, so a later drain writes
+        the event exactly where a synchronous capture would have.
+        """
+        if self._invalid_timestamp(event):
             return False
+        if self._privacy_skip(event):
+            return True
+
+        event.metadata.setdefault("event_id", uuid.uuid4().hex[:16])
+        self.queue.append({
+            "event": asdict(event),
+            "session_guid": session_guid or SessionManager.get_or_create_guid(),
+            "session_start_date": session_start_date or SessionManager.get_or_create_start_date(event.dt),
+        })
+        return True
+
+    def _replay_failures(self) -> int:
+        """Move events recorded in ``local_queue.jsonl`` into the write-ahead log."""
+        def queue_entries(entry: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+            events = entry.get("events") or ([entry["event"]] if entry.get("event") else [])
+            for record in events:
+                record.setdefault("metadata", {})
+                # Legacy failures carry no event_id; derive the same content hash used for dedup.
+                record["metadata"].setdefault("event_id", material_event_id(record))
+                yield {"event": record, "session_guid": entry.get("guid")}
+
+        return self.queue.replay(SyncStatusTracker.QUEUE_FILE, queue_entries)
+
+    def flush_queue(self, *, max_retries: int = 3, replay_failures: bool = True) -> bool:
+        """Drain the write-ahead log into a single commit and push.
+
+        Events already present in their target JSONL file (matched by event id)
+        are skipped, so replaying after a partial failure is idempotent.
+        """
+        if replay_failures:
+            replayed = self._replay_failures()
+            if replayed:
+                logger.info("Replaying %d failed capture(s) from %s", replayed, SyncStatusTracker.QUEUE_FILE)
+
+        entries = self.queue.claim()
+        success = False
+        try:
+            success = self._drain_entries(entries, max_retries)
+        finally:
+            # A failed drain unlocks its files so the next claim retries them.
+            if success:
+                self.queue.release()
+            else:
+                self.queue.abandon()
+        return success
+
+    def _drain_entries(self, entries: List[Dict[str, Any]], max_retries: int) -> bool:
+        resolved: List[Tuple[MaterialEvent, Dict[str, str]]] = []
+        for entry in entries:
+            event = MaterialEvent(**entry["event"])
+            resolved.append((
+                event,
+                self._resolve_paths(event, entry.get("session_guid"), entry.get("session_start_date")),
+            ))
+
+        if not resolved:
+            if self.git.is_repo_initialized() and self.git.has_unpushed_commits():
+                return self.git.commit_and_push("Sync pending materials", max_retries=max_retries)
+            return True
+
+        week_paths = sorted({paths["week_path"] for _, paths in resolved})
+        payload = {
+            "reason": "queue_drain",
+            "count": len(resolved),
+            "week_paths": week_paths,
+            "material_paths": sorted({paths["material_path"] for _, paths in resolved}),
+        }
+        commit_message = f"Sync {len(resolved)} queued materials [{', '.join(week_paths)}]"
+        return self._sync_resolved(
+            resolved, commit_message, payload, max_retries=max_retries, skip_existing=True,
+        )
+
+    @contextmanager
+    def batch(self, **kwargs) -> Iterator["MaterialBatch"]:
+        """Collect events inside a ``with`` block and sync them in one commit on exit.
+
+        Keyword arguments are forwarded to :meth:`record_events`. Nothing is
+        written if the block raises.
+        """
+        pending = MaterialBatch()
+        yield pending
+        pending.success = self.record_events(pending.events, **kwargs)
 
     def record_conversation(
         self,
@@ -352,42 +915,135 @@ class WeekReportRecorder:
         tags: Optional[List[str]] = None,
         evidence: Optional[List[str]] = None,
         next_actions: Optional[List[str]] = None,
+        defer: bool = False,
     ) -> bool:
-        event = MaterialEvent(
-            timestamp=datetime.now().isoformat(timespec='seconds'),
-            source_type="conversation",
-            title="Work conversation",
-            summary=MessageCompressor.compress(user_message),
+        """Capture one conversation; with ``defer`` only append it to the local queue."""
+        event = build_conversation_event(
+            user_message,
+            assistant_response,
             project=project,
-            evidence=evidence or [],
-            tags=['conversation', *(tags or [])],
-            outcome=ResponseSummarizer.summarize(assistant_response),
-            next_actions=next_actions or [],
-            content=MessageCompressor.compress(user_message),
-            metadata={"session_guid": SessionManager.get_or_create_guid()},
+            tags=tags,
+            evidence=evidence,
+            next_actions=next_actions,
         )
+        if defer:
+            return self.enqueue_event(event)
         return self.record_event(event)
 
-    def load_week_materials(self, year: int, week: int) -> List[Dict[str, Any]]:
-        """Read structured materials for a week from the local repo clone."""
-        week_root = Path(self.git.repo_path) / f"{year}/week{week:02d}/materials"
-        if not week_root.exists():
-            return []
+    def iter_materials(self, year: int, week: int) -> Iterator[MaterialEvent]:
+        """Yield a week's materials lazily in timestamp order.
+
+        The per-session files (and a compacted week's archive) are merged as
+        sorted streams, so memory does not grow with the size of the week.
+        """
+        week_path = f"{year}/week{week:02d}"
+        self.git.ensure_week_available(week_path)
+        for record in WeekArchive.iter_by_time(Path(self.git.repo_path) / week_path):
+            yield MaterialEvent.from_record(record)
 
-        items: List[Dict[str, Any]] = []
-        for path in sorted(week_root.glob("*.jsonl")):
-            with path.open('r', encoding='utf-8') as handle:
-                for line in handle:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        items.append(json.loads(line))
-                    except json.JSONDecodeError:
-                        logger.warning("Skipping malformed JSONL line in %s", path)
-        items.sort(key=lambda item: item.get("timestamp", ""))
+    def load_week_materials(self, year: int, week: int) -> List[Dict[str, Any]]:
+        """Read structured materials for a week from the local repo clone, in timestamp order.
+
+        Compacted weeks are streamed from their archive, together with any
+        material files added after compaction.
+        """
+        week_path = f"{year}/week{week:02d}"
+        self.git.ensure_week_available(week_path)
+        # The whole week is materialized anyway, and timsort finds the sorted
+        # per-file runs itself, so this beats the heap merge of iter_materials.
+        items = list(WeekArchive.iter_records(Path(self.git.repo_path) / week_path))
+        items.sort(key=record_time)
         return items
 
+    def load_materials_range(
+        self,
+        start: TimeBound,
+        end: TimeBound,
+        *,
+        max_workers: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Stream the materials captured from ``start`` to ``end``, inclusive, in timestamp order.
+
+        Bounds are ISO strings, dates or datetimes as for ``query_materials``;
+        a bare date as ``end`` covers that whole day. Every ISO week the range
+        touches is read and filtered in a thread pool, up to ``max_workers``
+        (default: ``RANGE_WORKERS``, capped at the CPU count) weeks ahead of
+        the consumer. Weeks are disjoint in time, so yielding
+        them in calendar order keeps the stream sorted while only the weeks in
+        flight are held in memory.
+        """
+        since, until = time_key(start), time_key(end, upper=True)
+        if not since or not until:
+            raise ValueError("load_materials_range needs both a start and an end")
+        if since > until:
+            return iter(())
+        week_paths = MaterialFormatter.week_paths_between(
+            date.fromisoformat(since[:10]), date.fromisoformat(until[:10]),
+        )
+        self.git.ensure_weeks_available(week_paths)
+        # Parsing holds the GIL, so threads beyond the CPU count only add contention.
+        workers = max_workers or min(self.RANGE_WORKERS, os.cpu_count() or 1)
+        return self._stream_weeks(week_paths, since, until, workers)
+
+    def _stream_weeks(self, week_paths: List[str], since: str, until: str, workers: int) -> Iterator[Dict[str, Any]]:
+        repo_dir = Path(self.git.repo_path)
+        last = len(week_paths) - 1
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for index, week_path in enumerate(week_paths):
+                # Only the first and last weeks can hold materials outside the range.
+                pending.append(pool.submit(
+                    WeekArchive.load_between,
+                    repo_dir / week_path,
+                    since if index == 0 else None,
+                    until if index == last else None,
+                ))
+                if len(pending) > workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+    def week_digest(self, year: int, week: int) -> str:
+        """Render the human-readable digest for a week, including compacted weeks."""
+        week_path = f"{year}/week{week:02d}"
+        self.git.ensure_week_available(week_path)
+        parts: List[str] = []
+        for name, records in WeekArchive.iter_sources(Path(self.git.repo_path) / week_path):
+            guid = Path(name).stem.partition("-")[2] or Path(name).stem
+            for index, record in enumerate(records):
+                event = MaterialEvent.from_record(record)
+                if index == 0:
+                    parts.append(MaterialFormatter.format_digest_header(guid, event.dt))
+                parts.append(MaterialFormatter.format_digest_entry(event))
+        return "".join(parts)
+
+    def load_week_rollup(self, year: int, week: int) -> Dict[str, Any]:
+        """Return the precomputed rollup for a week, rebuilding it if it is stale."""
+        week_path = f"{year}/week{week:02d}"
+        self.git.ensure_week_available(week_path)
+        return WeekRollup.load_current(Path(self.git.repo_path) / week_path).data
+
+    def query_materials(self, **filters) -> List[Dict[str, Any]]:
+        """Query materials across weeks through the incremental index.
+
+        Accepts the keyword filters of :meth:`MaterialIndex.query`
+        (``project``, ``since``, ``until``, ``tags``, ``source_type``, ``limit``).
+        The weeks the bounds cover are added to a sparse checkout first, so
+        the index sees their materials.
+        """
+        since, until = time_key(filters.get("since")), time_key(filters.get("until"), upper=True)
+        try:
+            start = date.fromisoformat(since[:10]) if since else None
+            end = date.fromisoformat(until[:10]) if until else None
+        except ValueError:  # Partial bounds such as "2026-07" still filter the index
+            start = end = None
+        if start:
+            self.git.ensure_weeks_available(MaterialFormatter.week_paths_between(start, end or date.today()))
+        else:
+            self.git.ensure_committed_weeks_available(MaterialFormatter.get_week_path(end) if end else None)
+        with MaterialIndex(self.git.repo_path) as index:
+            return index.query(**filters)
+
 
 def build_material_event(
     source_type: str,
@@ -401,9 +1057,10 @@ def build_material_event(
     next_actions: Optional[List[str]] = None,
     content: str = "",
     metadata: Optional[Dict[str, Any]] = None,
+    timestamp: Optional[str] = None,
 ) -> MaterialEvent:
     return MaterialEvent(
-        timestamp=datetime.now().isoformat(timespec='seconds'),
+        timestamp=timestamp or datetime.now().isoformat(timespec='seconds'),
         source_type=source_type,
         title=title,
         summary=MessageCompressor.compress(summary),
@@ -417,6 +1074,31 @@ def build_material_event(
     )
 
 
+def build_conversation_event(
+    user_message: str,
+    assistant_response: str,
+    *,
+    project: str = "",
+    tags: Optional[List[str]] = None,
+    evidence: Optional[List[str]] = None,
+    next_actions: Optional[List[str]] = None,
+) -> MaterialEvent:
+    compressed = MessageCompressor.compress(user_message)
+    return MaterialEvent(
+        timestamp=datetime.now().isoformat(timespec='seconds'),
+        source_type="conversation",
+        title="Work conversation",
+        summary=compressed,
+        project=project,
+        evidence=evidence or [],
+        tags=['conversation', *(tags or [])],
+        outcome=ResponseSummarizer.summarize(assistant_response),
+        next_actions=next_actions or [],
+        content=compressed,
+        metadata={"session_guid": SessionManager.get_or_create_guid()},
+    )
+
+
 def _build_arg_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Capture a conversation material for week reports.")
     parser.add_argument("--project", default="", help="Project or workstream name")
@@ -425,6 +1107,11 @@ def _build_arg_parser() -> argparse.ArgumentParser:
     parser.add_argument("--next-action", action="append", default=[], help="Next action, repeatable")
     parser.add_argument("--user-message", required=True, help="Original user message")
     parser.add_argument("--assistant-response", required=True, help="Assistant response")
+    parser.add_argument(
+        "--queue",
+        action="store_true",
+        help="Append to the local write-ahead log and return; sync_worker.py pushes it later",
+    )
     return parser
 
 
@@ -445,6 +1132,7 @@ def main() -> int:
         tags=args.tag,
         evidence=args.evidence,
         next_actions=args.next_action,
+        defer=args.queue,
     )
     return 0 if success else 1
 
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Local extractive summaries by sentence scoring.
+
+Text is split into sentences on CJK and latin sentence punctuation and on line
+breaks, and tokenized with the same CJK-aware tokenizer as the near-duplicate
+fingerprints (latin words plus CJK character bigrams). Two scorers are
+available:
+
+- ``tfidf``: each sentence scores the summed weight of its distinct terms,
+  where a term weighs its frequency in the whole text times its inverse
+  sentence frequency, normalized by the square root of the sentence length.
+  Sentences built from the text's recurring, specific terms rank highest.
+- ``textrank``: the ``TEXTRANK_CANDIDATES`` best sentences by ``tfidf`` are
+  re-ranked by PageRank over their term-overlap similarity graph.
+
+Texts longer than ``MAX_SCORED_CHARS`` are scored on an evenly spaced sample
+of their sentences (always including the first and last), so the cost of a
+summary stays bounded however long the response is; the rest score 0.
+
+The best sentences that fit the character budget are returned in their
+original order. With NumPy installed the TextRank graph is built and iterated
+as matrices; the pure Python fallback produces the same ranking. TF-IDF stays
+on ``collections.Counter``, which already counts in C.
+"""
+
+import math
+import operator
+import re
+from collections import Counter
+from itertools import chain
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+try:
+    from near_duplicates import _CJK_RUN, _LATIN_WORD, tokenize
+except ImportError:  # pragma: no cover - script/package dual use
+    from .near_duplicates import _CJK_RUN, _LATIN_WORD, tokenize
+
+
+METHODS = ("tfidf", "textrank")
+
+# The first and last sentences of a response tend to state the task and the
+# result; they get a small boost over equally scored sentences in between.
+POSITION_BONUS = 0.15
+TEXTRANK_CANDIDATES = 32
+TEXTRANK_DAMPING = 0.85
+TEXTRANK_ITERATIONS = 30
+TEXTRANK_TOLERANCE = 1e-4
+MIN_SENTENCE_TOKENS = 3
+# Roughly the most text scored per summary; longer texts are sampled (see _sampled).
+MAX_SCORED_CHARS = 12 * 1024
+
+_CODE_BLOCK = re.compile(r"```.*?```", re.S)
+_CJK_SENTENCE_ENDS = "。！？；"
+_LATIN_SENTENCE_ENDS = "!?.;:"
+# Whitespace other than spaces and line breaks (tabs, CR, NBSP, ideographic space).
+_ODD_SPACE = re.compile(r"[^\S \n]+")
+# CJK text is joined without spaces after these marks.
+_NO_SPACE_AFTER = tuple("。！？；，、：")
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences, dropping fenced code blocks."""
+    text = _CODE_BLOCK.sub("\n", text)
+    # CJK sentences need no space after their full stop, latin ones end at
+    # whitespace after their punctuation. str.replace is far cheaper than a
+    # regex split.
+    for mark in _CJK_SENTENCE_ENDS:
+        text = text.replace(mark, mark + "\n")
+    text = _ODD_SPACE.sub(" ", text)
+    for mark in _LATIN_SENTENCE_ENDS:
+        text = text.replace(mark + " ", mark + "\n")
+    sentences: List[str] = []
+    for piece in text.split("\n"):
+        piece = " ".join(piece.split()) if "  " in piece else piece.strip()
+        if piece:
+            sentences.append(piece)
+    return sentences
+
+
+def _join(sentences: Sequence[str]) -> str:
+    text = ""
+    for sentence in sentences:
+        if text and not text.endswith(_NO_SPACE_AFTER):
+            text += " "
+        text += sentence
+    return text
+
+
+def _tfidf(token_lists: List[List[str]]) -> List[float]:
+    term_sets = [set(tokens) for tokens in token_lists]
+    document = Counter(chain.from_iterable(token_lists))
+    sentence_freq = Counter(chain.from_iterable(term_sets))
+    total = len(token_lists)
+    weight = {term: count * math.log(total / sentence_freq[term]) for term, count in document.items()}
+    return [
+        sum(map(weight.__getitem__, terms)) / math.sqrt(len(tokens)) if tokens else 0.0
+        for terms, tokens in zip(term_sets, token_lists)
+    ]
+
+
+def _pagerank_python(similarity: List[Dict[int, float]]) -> List[float]:
+    size = len(similarity)
+    # Column-normalized edges grouped by target, as parallel source and weight lists.
+    sources: List[List[int]] = [[] for _ in similarity]
+    weights: List[List[float]] = [[] for _ in similarity]
+    for source, edges in enumerate(similarity):
+        total = sum(edges.values())
+        for target, value in edges.items():
+            sources[target].append(source)
+            weights[target].append(value / total)
+    ranks = [1.0 / size] * size
+    for _ in range(TEXTRANK_ITERATIONS):
+        # map() keeps the weighted sum of each node's inputs in C.
+        updated = [
+            (1 - TEXTRANK_DAMPING) / size
+            + TEXTRANK_DAMPING * sum(map(operator.mul, map(ranks.__getitem__, node_sources), node_weights))
+            for node_sources, node_weights in zip(sources, weights)
+        ]
+        converged = sum(abs(new - old) for new, old in zip(updated, ranks)) < TEXTRANK_TOLERANCE
+        ranks = updated
+        if converged:
+            break
+    return ranks
+
+
+def _textrank_python(token_lists: List[List[str]]) -> List[float]:
+    term_sets = [set(tokens) for tokens in token_lists]
+    log_lengths = [math.log(len(tokens) + 1) for tokens in token_lists]
+    similarity: List[Dict[int, float]] = [{} for _ in token_lists]
+    for i in range(len(term_sets)):
+        for j in range(i + 1, len(term_sets)):
+            shared = len(term_sets[i] & term_sets[j])
+            if shared:
+                value = shared / (log_lengths[i] + log_lengths[j])
+                similarity[i][j] = similarity[j][i] = value
+    return _pagerank_python(similarity)
+
+
+def _textrank_numpy(token_lists: List[List[str]]) -> List[float]:
+    vocabulary: Dict[str, int] = {}
+    rows: List[int] = []
+    columns: List[int] = []
+    for row, tokens in enumerate(token_lists):
+        for term in set(tokens):
+            rows.append(row)
+            columns.append(vocabulary.setdefault(term, len(vocabulary)))
+    size = len(token_lists)
+    incidence = np.zeros((size, len(vocabulary)))
+    incidence[rows, columns] = 1.0
+
+    # Shared distinct terms over the summed log lengths, as in the TextRank paper.
+    matrix = incidence @ incidence.T
+    np.fill_diagonal(matrix, 0.0)
+    log_lengths = np.log(np.fromiter((len(tokens) for tokens in token_lists), dtype=np.float64, count=size) + 1)
+    matrix /= log_lengths[:, None] + log_lengths[None, :]
+    out_weight = matrix.sum(axis=0)
+    matrix = np.divide(matrix, out_weight, out=np.zeros_like(matrix), where=out_weight > 0)
+
+    ranks = np.full(size, 1.0 / size)
+    for _ in range(TEXTRANK_ITERATIONS):
+        updated = (1 - TEXTRANK_DAMPING) / size + TEXTRANK_DAMPING * (matrix @ ranks)
+        converged = np.abs(updated - ranks).sum() < TEXTRANK_TOLERANCE
+        ranks = updated
+        if converged:
+            break
+    return ranks.tolist()
+
+
+def _sampled(sentences: Sequence[str]) -> List[int]:
+    """Indices of the sentences to score: all of them, or an even sample of long texts."""
+    total = sum(map(len, sentences))
+    if total <= MAX_SCORED_CHARS:
+        return list(range(len(sentences)))
+    indices = list(range(0, len(sentences), math.ceil(total / MAX_SCORED_CHARS)))
+    if indices[-1] != len(sentences) - 1:
+        indices.append(len(sentences) - 1)
+    return indices
+
+
+def score_sentences(sentences: Sequence[str], method: str = "tfidf") -> List[float]:
+    """Return one score per sentence; higher is more summary-worthy."""
+    if method not in METHODS:
+        raise ValueError(f"Unknown summary method: {method}")
+    indices = _sampled(sentences)
+    if len(indices) < len(sentences):
+        scores = [0.0] * len(sentences)
+        for index, score in zip(indices, score_sentences([sentences[index] for index in indices], method)):
+            scores[index] = score
+        return scores
+
+    if any(_CJK_RUN.search(sentence) for sentence in sentences):
+        token_lists = [tokenize(sentence) for sentence in sentences]
+    else:
+        # Same tokens as tokenize() without its CJK pass.
+        token_lists = [_LATIN_WORD.findall(sentence.lower()) for sentence in sentences]
+    scores = _tfidf(token_lists)
+    for index, tokens in enumerate(token_lists):
+        if len(tokens) < MIN_SENTENCE_TOKENS:
+            scores[index] = 0.0
+    bonus = {0: 1 + POSITION_BONUS, len(scores) - 1: 1 + POSITION_BONUS} if len(scores) > 1 else {}
+    for index, factor in bonus.items():
+        scores[index] *= factor
+
+    if method == "textrank":
+        candidates = sorted(
+            (index for index, score in enumerate(scores) if score > 0),
+            key=lambda index: -scores[index],
+        )[:TEXTRANK_CANDIDATES]
+        if len(candidates) > 1:
+            textrank = _textrank_numpy if np is not None else _textrank_python
+            ranks = textrank([token_lists[index] for index in candidates])
+            # Ranks stay below 1, so the offset keeps every candidate above the rest.
+            scores = [0.0] * len(scores)
+            for index, rank in zip(candidates, ranks):
+                scores[index] = 1.0 + rank * bonus.get(index, 1.0)
+    return scores
+
+
+def summarize(
+    text: str,
+    max_chars: int,
+    *,
+    method: str = "tfidf",
+    max_sentences: Optional[int] = None,
+) -> str:
+    """Return the best-scoring sentences of ``text`` that fit in ``max_chars``, in text order."""
+    sentences = split_sentences(text)
+    if not sentences:
+        return ""
+    scores = score_sentences(sentences, method)
+
+    chosen: List[int] = []
+    seen = set()
+    used = 0
+    for index in sorted(range(len(sentences)), key=lambda index: -scores[index]):
+        if max_sentences is not None and len(chosen) >= max_sentences:
+            break
+        if scores[index] <= 0 and chosen:
+            break
+        cost = len(sentences[index]) + (1 if chosen else 0)
+        if used + cost > max_chars or sentences[index] in seen:
+            continue
+        chosen.append(index)
+        seen.add(sentences[index])
+        used += cost
+
+    if not chosen:
+        # Even the best sentence is over budget: truncate it.
+        best = max(range(len(sentences)), key=lambda index: scores[index])
+        return sentences[best][:max_chars - 3] + "..."
+    return _join([sentences[index] for index in sorted(chosen)])
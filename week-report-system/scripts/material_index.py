@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Incrementally maintained SQLite index over week report materials.
+
+The index lives next to the local clone (``~/.week-report-repo/<repo>.index.sqlite``)
+and stores, per material line, its file offset plus the fields used for
+filtering: timestamp, project, source_type and tags. Material files are
+append-only, so a file that grew is indexed from its previous size as long as
+its last indexed line is still in place (a union merge can insert lines
+mid-file, which forces a full re-read); files whose mtime and size are
+unchanged are never re-read. Compacted weeks
+are indexed by record number within their archive, which is re-read as a
+whole only when it is rewritten.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+try:
+    from git_operations import create_git_manager
+    from week_archive import ARCHIVE_CODECS, ARCHIVE_STEM, WeekArchive
+except ImportError:  # pragma: no cover - script/package dual use
+    from .git_operations import create_git_manager
+    from .week_archive import ARCHIVE_CODECS, ARCHIVE_STEM, WeekArchive
+
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+TimeBound = Union[str, date, datetime, None]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    tail_length INTEGER,
+    tail_sha1 TEXT
+);
+CREATE TABLE IF NOT EXISTS materials (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    ts TEXT NOT NULL,
+    project TEXT NOT NULL,
+    source_type TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS material_tags (
+    material_id INTEGER NOT NULL,
+    tag TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_materials_ts ON materials(ts);
+CREATE INDEX IF NOT EXISTS idx_materials_project_ts ON materials(project, ts);
+CREATE INDEX IF NOT EXISTS idx_materials_source_type ON materials(source_type);
+CREATE INDEX IF NOT EXISTS idx_materials_path ON materials(path);
+CREATE INDEX IF NOT EXISTS idx_material_tags_tag ON material_tags(tag, material_id);
+CREATE INDEX IF NOT EXISTS idx_material_tags_material ON material_tags(material_id);
+"""
+
+
+def time_key(value: TimeBound, *, upper: bool = False) -> Optional[str]:
+    """Normalize a bound to the ``YYYY-MM-DDTHH:MM:SS`` prefix used for comparisons.
+
+    A bare date as upper bound covers that whole day.
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None).isoformat(timespec='seconds')
+    if isinstance(value, date):
+        value = value.isoformat()
+    value = str(value).strip()
+    if len(value) == 10 and upper:
+        return f"{value}T23:59:59"
+    return value[:19]
+
+
+class MaterialIndex:
+    """SQLite sidecar index keyed by material file offset."""
+
+    def __init__(self, repo_path: str, db_path: Optional[str] = None):
+        self.repo_path = repo_path
+        repo_dir = Path(repo_path)
+        self.db_path = db_path or str(repo_dir.parent / f"{repo_dir.name}.index.sqlite")
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(files)")}
+        if "tail_sha1" not in columns:
+            # Indexes from before tail checks; their files are re-read once.
+            with self.conn:
+                self.conn.execute("ALTER TABLE files ADD COLUMN tail_length INTEGER")
+                self.conn.execute("ALTER TABLE files ADD COLUMN tail_sha1 TEXT")
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "MaterialIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _material_files(self) -> Iterable[Path]:
+        repo_dir = Path(self.repo_path)
+        yield from repo_dir.glob("*/week*/materials/*.jsonl")
+        for suffix in ARCHIVE_CODECS.values():
+            yield from repo_dir.glob(f"*/week*/{ARCHIVE_STEM}{suffix}")
+
+    def _forget_file(self, rel_path: str) -> None:
+        self.conn.execute(
+            "DELETE FROM material_tags WHERE material_id IN (SELECT id FROM materials WHERE path = ?)",
+            (rel_path,),
+        )
+        self.conn.execute("DELETE FROM materials WHERE path = ?", (rel_path,))
+        self.conn.execute("DELETE FROM files WHERE path = ?", (rel_path,))
+
+    def _insert(self, rel_path: str, offset: int, length: int, item: Dict[str, Any]) -> None:
+        cursor = self.conn.execute(
+            "INSERT INTO materials (path, offset, length, ts, project, source_type) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                rel_path,
+                offset,
+                length,
+                str(item.get("timestamp", ""))[:19],
+                item.get("project") or "",
+                item.get("source_type") or "",
+            ),
+        )
+        tags = item.get("tags") or []
+        if tags:
+            self.conn.executemany(
+                "INSERT INTO material_tags (material_id, tag) VALUES (?, ?)",
+                [(cursor.lastrowid, str(tag)) for tag in tags],
+            )
+
+    def _index_archive(self, path: Path, rel_path: str) -> int:
+        """Index an archive by record number (``length`` 0); returns its size."""
+        for number, item in enumerate(WeekArchive.read_archive(path)):
+            self._insert(rel_path, number, 0, item)
+        return path.stat().st_size
+
+    @staticmethod
+    def _tail_intact(path: Path, size: int, tail: Tuple[Optional[int], Optional[str]]) -> bool:
+        """True if the last line indexed from ``path`` still ends at ``size``."""
+        length, digest = tail
+        if not length or not digest or length > size:
+            return False
+        with path.open('rb') as handle:
+            handle.seek(size - length)
+            return hashlib.sha1(handle.read(length)).hexdigest() == digest
+
+    def _index_file(self, path: Path, rel_path: str, start: int) -> Tuple[int, Optional[bytes]]:
+        """Index complete lines from ``start``; return the offset after the last one, and that line."""
+        end = start
+        last = None
+        with path.open('rb') as handle:
+            handle.seek(start)
+            for raw in handle:
+                if not raw.endswith(b"\n"):
+                    # Partially written trailing line; pick it up on the next refresh.
+                    break
+                offset = end
+                end += len(raw)
+                last = raw
+                if not raw.strip():
+                    continue
+                try:
+                    item = json.loads(raw)
+                except json.JSONDecodeError:
+                    logger.warning("Skipping malformed JSONL line in %s", path)
+                    continue
+                self._insert(rel_path, offset, len(raw), item)
+        return end, last
+
+    def refresh(self) -> int:
+        """Bring the index up to date and return the number of files (re)read."""
+        known: Dict[str, Tuple[int, int, Optional[int], Optional[str]]] = {
+            row[0]: row[1:]
+            for row in self.conn.execute("SELECT path, mtime_ns, size, tail_length, tail_sha1 FROM files")
+        }
+        seen = set()
+        touched = 0
+
+        with self.conn:
+            for path in self._material_files():
+                rel_path = path.relative_to(self.repo_path).as_posix()
+                seen.add(rel_path)
+                stat = path.stat()
+                previous = known.get(rel_path)
+                if previous and previous[0] == stat.st_mtime_ns and previous[1] == stat.st_size:
+                    continue
+
+                tail: Tuple[Optional[int], Optional[str]] = (None, None)
+                if WeekArchive.is_archive(path):
+                    # Archives are rewritten, never appended to.
+                    self._forget_file(rel_path)
+                    indexed_size = self._index_archive(path, rel_path)
+                else:
+                    start = 0
+                    if previous and stat.st_size > previous[1] and self._tail_intact(path, previous[1], previous[2:]):
+                        start = previous[1]
+                        tail = previous[2:]
+                    else:
+                        self._forget_file(rel_path)
+                    indexed_size, last = self._index_file(path, rel_path, start)
+                    if last is not None:
+                        tail = (len(last), hashlib.sha1(last).hexdigest())
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO files (path, mtime_ns, size, tail_length, tail_sha1) VALUES (?, ?, ?, ?, ?)",
+                    # Store the indexed size so a torn trailing line is re-read later.
+                    (rel_path, stat.st_mtime_ns if indexed_size == stat.st_size else 0, indexed_size, *tail),
+                )
+                touched += 1
+
+            for rel_path in set(known) - seen:
+                self._forget_file(rel_path)
+
+        return touched
+
+    def rebuild(self) -> int:
+        with self.conn:
+            self.conn.execute("DELETE FROM material_tags")
+            self.conn.execute("DELETE FROM materials")
+            self.conn.execute("DELETE FROM files")
+        return self.refresh()
+
+    def query(
+        self,
+        *,
+        project: Optional[str] = None,
+        since: TimeBound = None,
+        until: TimeBound = None,
+        tags: Optional[List[str]] = None,
+        source_type: Optional[str] = None,
+        limit: Optional[int] = None,
+        refresh: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """Return matching materials in timestamp order.
+
+        ``tags`` must all be present on a material. ``since``/``until`` are
+        inclusive and accept ISO strings, dates or datetimes.
+        """
+        if refresh:
+            self.refresh()
+
+        clauses: List[str] = []
+        params: List[Any] = []
+        if project is not None:
+            clauses.append("m.project = ?")
+            params.append(project)
+        if source_type is not None:
+            clauses.append("m.source_type = ?")
+            params.append(source_type)
+        since_key = time_key(since)
+        if since_key:
+            clauses.append("m.ts >= ?")
+            params.append(since_key)
+        until_key = time_key(until, upper=True)
+        if until_key:
+            clauses.append("m.ts <= ?")
+            params.append(until_key)
+        for tag in tags or []:
+            clauses.append("EXISTS (SELECT 1 FROM material_tags t WHERE t.material_id = m.id AND t.tag = ?)")
+            params.append(tag)
+
+        sql = "SELECT m.path, m.offset, m.length FROM materials m"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY m.ts, m.path, m.offset"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        rows = self.conn.execute(sql, params).fetchall()
+        return self._read_rows(rows)
+
+    def _read_archived(self, rows: List[Tuple[str, int, int]]) -> Dict[Tuple[str, int], Dict[str, Any]]:
+        """Stream each archive referenced by ``rows`` once, keeping only the wanted records."""
+        wanted: Dict[str, set] = {}
+        for rel_path, number, _ in rows:
+            if WeekArchive.is_archive(rel_path):
+                wanted.setdefault(rel_path, set()).add(number)
+
+        records: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        for rel_path, numbers in wanted.items():
+            last = max(numbers)
+            for number, item in enumerate(WeekArchive.read_archive(Path(self.repo_path) / rel_path)):
+                if number in numbers:
+                    records[(rel_path, number)] = item
+                if number >= last:
+                    break
+        return records
+
+    def _read_rows(self, rows: List[Tuple[str, int, int]]) -> List[Dict[str, Any]]:
+        archived = self._read_archived(rows)
+        handles = {}
+        items: List[Dict[str, Any]] = []
+        try:
+            for rel_path, offset, length in rows:
+                if WeekArchive.is_archive(rel_path):
+                    if (rel_path, offset) in archived:
+                        items.append(archived[(rel_path, offset)])
+                    continue
+                handle = handles.get(rel_path)
+                if handle is None:
+                    handle = handles[rel_path] = open(os.path.join(self.repo_path, rel_path), 'rb')
+                handle.seek(offset)
+                items.append(json.loads(handle.read(length)))
+        finally:
+            for handle in handles.values():
+                handle.close()
+        return items
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Query week report materials through a local index.")
+    parser.add_argument("--pull", action="store_true", help="Pull the report repo before querying")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    query = subparsers.add_parser("query", help="Print matching materials as JSONL")
+    query.add_argument("--project")
+    query.add_argument("--source-type")
+    query.add_argument("--since", help="Inclusive lower bound, e.g. 2026-07-01")
+    query.add_argument("--until", help="Inclusive upper bound, e.g. 2026-09-30")
+    query.add_argument("--tag", action="append", default=[], help="Required tag, repeatable")
+    query.add_argument("--limit", type=int)
+
+    subparsers.add_parser("refresh", help="Update the index for changed material files")
+    subparsers.add_parser("rebuild", help="Drop and rebuild the index")
+    return parser
+
+
+def main() -> int:
+    parser = _build_parser()
+    args = parser.parse_args()
+
+    git = create_git_manager()
+    if not git:
+        logger.error("Missing Git environment variables for week report system")
+        return 1
+    if args.pull:
+        git.pull()
+
+    with MaterialIndex(git.repo_path) as index:
+        if args.command == "refresh":
+            print(f"Re-read {index.refresh()} file(s)")
+        elif args.command == "rebuild":
+            print(f"Indexed {index.rebuild()} file(s)")
+        else:
+            for item in index.query(
+                project=args.project,
+                since=args.since,
+                until=args.until,
+                tags=args.tag,
+                source_type=args.source_type,
+                limit=args.limit,
+            ):
+                print(json.dumps(item, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
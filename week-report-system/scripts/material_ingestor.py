@@ -4,15 +4,19 @@ CLI for explicitly ingesting weekly report materials.
 """
 
 import argparse
+import json
 import logging
-from typing import Dict
+import sys
+from typing import Any, Dict, Iterator, List, TextIO
 
 try:
-    from conversation_logger import WeekReportRecorder, build_material_event
+    from conversation_logger import MaterialEvent, MessageCompressor, WeekReportRecorder, build_material_event
     from git_operations import create_git_manager
+    from repo_activity_collector import RepoActivityCollector
 except ImportError:  # pragma: no cover - script/package dual use
-    from .conversation_logger import WeekReportRecorder, build_material_event
+    from .conversation_logger import MaterialEvent, MessageCompressor, WeekReportRecorder, build_material_event
     from .git_operations import create_git_manager
+    from .repo_activity_collector import RepoActivityCollector
 
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -30,8 +34,83 @@ def _parse_metadata(entries) -> Dict[str, str]:
     return metadata
 
 
+def _iter_event_records(handle: TextIO) -> Iterator[Dict[str, Any]]:
+    for line_number, line in enumerate(handle, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            logger.warning("Skipping malformed JSONL line %d", line_number)
+            continue
+        if not isinstance(record, dict) or not record.get("title") or not record.get("summary"):
+            logger.warning("Skipping line %d without title/summary", line_number)
+            continue
+        yield record
+
+
+def _event_from_record(record: Dict[str, Any]) -> MaterialEvent:
+    source_type = record.get("source_type") or "document"
+    return build_material_event(
+        source_type="repo_activity" if source_type == "repo-activity" else source_type,
+        title=record["title"],
+        summary=record["summary"],
+        project=record.get("project", ""),
+        tags=record.get("tags"),
+        evidence=record.get("evidence"),
+        outcome=record.get("outcome", ""),
+        next_actions=record.get("next_actions"),
+        content=record.get("content", ""),
+        metadata=record.get("metadata"),
+        timestamp=record.get("timestamp"),
+    )
+
+
+def _load_batch_events(path: str) -> List[MaterialEvent]:
+    if path == "-":
+        return [_event_from_record(record) for record in _iter_event_records(sys.stdin)]
+    with open(path, 'r', encoding='utf-8') as handle:
+        return [_event_from_record(record) for record in _iter_event_records(handle)]
+
+
+def _compress_source(path: str) -> str:
+    """Compress a file (or stdin for '-') without loading it into memory."""
+    if path == "-":
+        return MessageCompressor.compress_file(sys.stdin)
+    with open(path, 'r', encoding='utf-8', errors='replace') as handle:
+        return MessageCompressor.compress_file(handle)
+
+
+def _collect_repo_activity(args, recorder: WeekReportRecorder) -> int:
+    collector = RepoActivityCollector(since_days=args.since_days, max_workers=args.max_workers)
+    results = collector.collect(args.repo, project=args.project)
+    events = [event for activity in results for event in activity.events]
+    for event in events:
+        event.tags.extend(tag for tag in args.tag if tag not in event.tags)
+
+    if not events:
+        logger.info("No new commits in %d repo(s)", len(args.repo))
+        collector.commit_watermarks(results)
+        return 0
+
+    if args.queue:
+        # Enqueue every event, as record_events writes every valid one.
+        success = all([recorder.enqueue_event(event) for event in events])
+    else:
+        success = recorder.record_events(events)
+    if success:
+        collector.commit_watermarks(results)
+    return 0 if success else 1
+
+
 def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Ingest a material into the week report repository.")
+    parser.add_argument(
+        "--queue",
+        action="store_true",
+        help="Append to the local write-ahead log and return; sync_worker.py pushes it later",
+    )
     subparsers = parser.add_subparsers(dest="source_type", required=True)
 
     conversation = subparsers.add_parser("conversation", help="Capture a conversation material")
@@ -43,16 +122,46 @@ def _build_parser() -> argparse.ArgumentParser:
     conversation.add_argument("--assistant-response", required=True)
 
     for name in ["document", "repo-activity"]:
+        # repo-activity can instead be collected from git history with --repo.
+        manual_only = name == "document"
         parser_i = subparsers.add_parser(name, help=f"Capture a {name} material")
         parser_i.add_argument("--project", default="")
-        parser_i.add_argument("--title", required=True)
-        parser_i.add_argument("--summary", required=True)
+        parser_i.add_argument("--title", required=manual_only)
+        summary_group = parser_i.add_mutually_exclusive_group(required=manual_only)
+        summary_group.add_argument("--summary")
+        summary_group.add_argument("--summary-file", help="Read the summary from a file, or '-' for stdin")
         parser_i.add_argument("--outcome", default="")
-        parser_i.add_argument("--content", default="")
+        content_group = parser_i.add_mutually_exclusive_group()
+        content_group.add_argument("--content", default="")
+        content_group.add_argument(
+            "--content-file",
+            help="Stream the content from a file, or '-' for stdin, with bounded memory",
+        )
         parser_i.add_argument("--tag", action="append", default=[])
         parser_i.add_argument("--evidence", action="append", default=[])
         parser_i.add_argument("--next-action", action="append", default=[])
         parser_i.add_argument("--metadata", action="append", default=[], help="key=value, repeatable")
+        if not manual_only:
+            parser_i.add_argument(
+                "--repo",
+                action="append",
+                default=[],
+                help="Local repository to collect new commits from, repeatable",
+            )
+            parser_i.add_argument(
+                "--since-days",
+                type=int,
+                default=7,
+                help="History to scan for repos without a watermark (default: 7)",
+            )
+            parser_i.add_argument("--max-workers", type=int, default=8)
+
+    batch = subparsers.add_parser("batch", help="Capture many materials from JSONL in a single commit")
+    batch.add_argument(
+        "--from-file",
+        default="-",
+        help="JSONL file with one material event per line (default: stdin)",
+    )
 
     return parser
 
@@ -68,6 +177,17 @@ def main() -> int:
 
     recorder = WeekReportRecorder(git)
 
+    if args.source_type == "batch":
+        events = _load_batch_events(args.from_file)
+        if not events:
+            logger.warning("No material events found in %s", args.from_file)
+            return 0
+        if args.queue:
+            success = all([recorder.enqueue_event(event) for event in events])
+        else:
+            success = recorder.record_events(events)
+        return 0 if success else 1
+
     if args.source_type == "conversation":
         success = recorder.record_conversation(
             args.user_message,
@@ -76,22 +196,33 @@ def main() -> int:
             tags=args.tag,
             evidence=args.evidence,
             next_actions=args.next_action,
+            defer=args.queue,
         )
         return 0 if success else 1
 
+    if args.source_type == "repo-activity" and args.repo:
+        return _collect_repo_activity(args, recorder)
+    if not args.title or not (args.summary or args.summary_file):
+        parser.error("--title and --summary/--summary-file are required unless --repo is given")
+
+    if args.summary_file == "-" and args.content_file == "-":
+        parser.error("only one of --summary-file and --content-file can read stdin")
+
     source_type = "repo_activity" if args.source_type == "repo-activity" else "document"
     event = build_material_event(
         source_type=source_type,
         title=args.title,
-        summary=args.summary,
+        summary=_compress_source(args.summary_file) if args.summary_file else args.summary,
         project=args.project,
         tags=args.tag,
         evidence=args.evidence,
         outcome=args.outcome,
         next_actions=args.next_action,
-        content=args.content,
+        content=_compress_source(args.content_file) if args.content_file else args.content,
         metadata=_parse_metadata(args.metadata),
     )
+    if args.queue:
+        return 0 if recorder.enqueue_event(event) else 1
     success = recorder.record_event(event)
     return 0 if success else 1
 
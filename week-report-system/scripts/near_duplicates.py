@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+SimHash fingerprints and a banded LSH index for near-duplicate materials.
+
+A 64-bit SimHash is computed over an event's summary and outcome. The index
+splits each fingerprint into ``bands`` equal chunks. Two fingerprints within
+``max_distance`` bits share at least one chunk whenever
+``max_distance < bands``, so a lookup only compares against the few
+candidates in the matching buckets. With the default four 16-bit bands each
+band has 65536 buckets, so a bucket holds almost nothing but true matches
+even for weeks of thousands of events.
+"""
+
+import hashlib
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+FINGERPRINT_BITS = 64
+
+_LATIN_WORD = re.compile(r"[a-z0-9_]+")
+_CJK_RUN = re.compile(r"[㐀-䶿一-鿿豈-﫿]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased latin words plus character bigrams of CJK runs."""
+    text = text.lower()
+    tokens = _LATIN_WORD.findall(text)
+    for run in _CJK_RUN.findall(text):
+        # Most CJK words are one or two characters: the run is its only token.
+        if len(run) <= 2:
+            tokens.append(run)
+        else:
+            tokens += [run[i:i + 2] for i in range(len(run) - 1)]
+    return tokens
+
+
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def simhash(text: str) -> int:
+    """Return a 64-bit SimHash of ``text`` (0 for text without tokens)."""
+    weights = [0] * FINGERPRINT_BITS
+    for token, count in Counter(tokenize(text)).items():
+        value = _token_hash(token)
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += count if value >> bit & 1 else -count
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def hamming_distance(left: int, right: int) -> int:
+    return bin(left ^ right).count("1")
+
+
+def event_fingerprint(summary: str, outcome: str) -> str:
+    """Fingerprint used for material events, as a 16-digit hex string."""
+    return f"{simhash(f'{summary} {outcome}'):016x}"
+
+
+class SimHashIndex:
+    """Banded LSH index from fingerprint chunks to event ids.
+
+    Only the fingerprints are serialized, as plain JSON that can be stored
+    alongside other per-week derived data; the buckets are rebuilt in memory
+    on load.
+    """
+
+    def __init__(self, bands: int = 4, max_distance: int = 3, data: Optional[Dict[str, Any]] = None):
+        if max_distance >= bands:
+            raise ValueError("max_distance must be smaller than bands for LSH recall")
+        self.bands = bands
+        self.max_distance = max_distance
+        self.fingerprints: Dict[str, str] = {}
+        self.buckets: Dict[Tuple[int, int], List[str]] = {}
+        self._band_bits = FINGERPRINT_BITS // self.bands
+        for event_id, fingerprint in (data or {}).get("fingerprints", {}).items():
+            self.add(event_id, fingerprint)
+
+    def _keys(self, fingerprint: int) -> List[Tuple[int, int]]:
+        mask = (1 << self._band_bits) - 1
+        return [(band, fingerprint >> (band * self._band_bits) & mask) for band in range(self.bands)]
+
+    def find(self, fingerprint: str) -> Optional[str]:
+        """Return the id of the closest indexed event within ``max_distance``."""
+        value = int(fingerprint, 16)
+        if value == 0:
+            return None
+        best_id, best_distance = None, self.max_distance + 1
+        for key in self._keys(value):
+            for event_id in self.buckets.get(key, []):
+                distance = hamming_distance(value, int(self.fingerprints[event_id], 16))
+                if distance < best_distance:
+                    best_id, best_distance = event_id, distance
+        return best_id
+
+    def add(self, event_id: str, fingerprint: str) -> None:
+        if event_id in self.fingerprints:
+            return
+        self.fingerprints[event_id] = fingerprint
+        for key in self._keys(int(fingerprint, 16)):
+            self.buckets.setdefault(key, []).append(event_id)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"fingerprints": self.fingerprints}
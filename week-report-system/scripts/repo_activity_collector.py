@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Collect repo_activity materials directly from local git history.
+
+Repositories are scanned in parallel. Each repo keeps a watermark (the last
+ingested HEAD) under ``~/.week-report-repo/watermarks``, so a repo without new
+commits costs a single ``git rev-parse``. New commits are grouped by author
+date and emitted as one ``repo_activity`` material per repo per day, with
+per-author diffstats in the metadata.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import subprocess
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    from conversation_logger import MaterialEvent, build_material_event
+except ImportError:  # pragma: no cover - script/package dual use
+    from .conversation_logger import MaterialEvent, build_material_event
+
+
+logger = logging.getLogger(__name__)
+
+_RECORD_SEP = "\x1e"
+_FIELD_SEP = "\x1f"
+_LOG_FORMAT = f"{_RECORD_SEP}%H{_FIELD_SEP}%an{_FIELD_SEP}%ad{_FIELD_SEP}%s"
+MAX_EVIDENCE = 20
+
+
+@dataclass
+class RepoActivity:
+    """Collected events for one repository plus the HEAD to store as its watermark."""
+
+    repo_path: str
+    head: Optional[str] = None
+    events: List[MaterialEvent] = field(default_factory=list)
+    error: str = ""
+
+
+class RepoActivityCollector:
+    """Turn new commits in local repositories into repo_activity materials."""
+
+    def __init__(
+        self,
+        watermark_dir: Optional[Path] = None,
+        *,
+        since_days: int = 7,
+        max_workers: int = 8,
+        timeout: int = 60,
+    ):
+        self.watermark_dir = Path(watermark_dir) if watermark_dir else Path.home() / ".week-report-repo" / "watermarks"
+        self.since_days = since_days
+        self.max_workers = max_workers
+        self.timeout = timeout
+
+    @staticmethod
+    def _git(repo_path: str, *args: str, timeout: int = 60) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            ['git', '-C', repo_path, *args],
+            capture_output=True,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            timeout=timeout,
+        )
+
+    def watermark_path(self, repo_path: str) -> Path:
+        resolved = os.path.realpath(repo_path)
+        digest = hashlib.sha1(resolved.encode('utf-8')).hexdigest()[:10]
+        return self.watermark_dir / f"{os.path.basename(resolved)}-{digest}.json"
+
+    def read_watermark(self, repo_path: str) -> Optional[str]:
+        path = self.watermark_path(repo_path)
+        try:
+            return json.loads(path.read_text(encoding='utf-8')).get("last_sha")
+        except (OSError, ValueError):
+            return None
+
+    def save_watermark(self, repo_path: str, head: str) -> None:
+        self.watermark_dir.mkdir(parents=True, exist_ok=True)
+        path = self.watermark_path(repo_path)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps({
+            "repo": os.path.realpath(repo_path),
+            "last_sha": head,
+            "updated_at": datetime.now().isoformat(timespec='seconds'),
+        }) + "\n", encoding='utf-8')
+        os.replace(tmp_path, path)
+
+    def _log_range(self, repo_path: str, last_sha: Optional[str], head: str) -> List[str]:
+        if last_sha:
+            check = self._git(repo_path, 'merge-base', '--is-ancestor', last_sha, head, timeout=self.timeout)
+            if check.returncode == 0:
+                return [f"{last_sha}..{head}"]
+            logger.warning("Watermark %s is not an ancestor of HEAD in %s, rescanning", last_sha[:8], repo_path)
+        return [f"--since={self.since_days} days ago", head]
+
+    @staticmethod
+    def _parse_log(output: str) -> List[Dict[str, Any]]:
+        commits: List[Dict[str, Any]] = []
+        for record in output.split(_RECORD_SEP):
+            if not record.strip():
+                continue
+            header, _, stats = record.partition("\n")
+            sha, author, date_text, subject = (header.split(_FIELD_SEP) + ["", "", ""])[:4]
+            insertions = deletions = files = 0
+            for line in stats.splitlines():
+                parts = line.split("\t")
+                if len(parts) != 3:
+                    continue
+                files += 1
+                # Binary files report "-" for both counts.
+                insertions += int(parts[0]) if parts[0].isdigit() else 0
+                deletions += int(parts[1]) if parts[1].isdigit() else 0
+            commits.append({
+                "sha": sha,
+                "author": author,
+                "date": datetime.fromisoformat(date_text),
+                "subject": subject,
+                "insertions": insertions,
+                "deletions": deletions,
+                "files": files,
+            })
+        return commits
+
+    def _build_events(self, repo_path: str, project: str, commits: List[Dict[str, Any]], head: str) -> List[MaterialEvent]:
+        repo_name = os.path.basename(os.path.realpath(repo_path))
+        by_day: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for commit in commits:
+            by_day[commit["date"].strftime("%Y-%m-%d")].append(commit)
+
+        events: List[MaterialEvent] = []
+        for day, day_commits in sorted(by_day.items()):
+            day_commits.sort(key=lambda commit: commit["date"])
+            authors: Dict[str, Dict[str, int]] = defaultdict(lambda: {"commits": 0, "insertions": 0, "deletions": 0, "files": 0})
+            for commit in day_commits:
+                stats = authors[commit["author"]]
+                stats["commits"] += 1
+                for key in ("insertions", "deletions", "files"):
+                    stats[key] += commit[key]
+
+            subjects = list(dict.fromkeys(commit["subject"] for commit in day_commits if commit["subject"]))
+            summary = f"{len(day_commits)} commit(s) by {', '.join(sorted(authors))}: " + "; ".join(subjects)
+            last_commit_time = day_commits[-1]["date"].replace(tzinfo=None)
+            events.append(build_material_event(
+                source_type="repo_activity",
+                title=f"{repo_name} activity on {day}",
+                summary=summary,
+                project=project or repo_name,
+                tags=["repo_activity"],
+                evidence=[f"commit:{commit['sha'][:7]}" for commit in day_commits[-MAX_EVIDENCE:]],
+                metadata={
+                    "repo": repo_name,
+                    "repo_path": os.path.realpath(repo_path),
+                    "day": day,
+                    "commits": len(day_commits),
+                    "head_sha": head,
+                    "authors": dict(authors),
+                },
+                timestamp=last_commit_time.isoformat(timespec='seconds'),
+            ))
+        return events
+
+    def collect_repo(self, repo_path: str, project: str = "") -> RepoActivity:
+        """Collect events for commits added since the repo's watermark."""
+        activity = RepoActivity(repo_path=repo_path)
+        try:
+            head_result = self._git(repo_path, 'rev-parse', 'HEAD', timeout=self.timeout)
+            if head_result.returncode != 0:
+                activity.error = head_result.stderr.strip() or "not a git repository"
+                return activity
+            activity.head = head_result.stdout.strip()
+
+            last_sha = self.read_watermark(repo_path)
+            if last_sha == activity.head:
+                return activity
+
+            log_result = self._git(
+                repo_path, 'log', '--no-merges', '--numstat', '--date=iso-strict', f'--format={_LOG_FORMAT}',
+                *self._log_range(repo_path, last_sha, activity.head),
+                timeout=self.timeout,
+            )
+            if log_result.returncode != 0:
+                activity.error = log_result.stderr.strip()
+                return activity
+
+            commits = self._parse_log(log_result.stdout)
+            activity.events = self._build_events(repo_path, project, commits, activity.head)
+        except Exception as exc:  # pragma: no cover - defensive
+            activity.error = str(exc)
+        return activity
+
+    def collect(self, repo_paths: Sequence[str], project: str = "") -> List[RepoActivity]:
+        """Collect all repositories concurrently, preserving input order."""
+        if not repo_paths:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(repo_paths))) as pool:
+            results = list(pool.map(lambda path: self.collect_repo(path, project), repo_paths))
+        for activity in results:
+            if activity.error:
+                logger.warning("Skipping %s: %s", activity.repo_path, activity.error)
+        return results
+
+    def commit_watermarks(self, results: Sequence[RepoActivity]) -> None:
+        """Advance watermarks once the collected events have been recorded."""
+        for activity in results:
+            if activity.head and not activity.error:
+                self.save_watermark(activity.repo_path, activity.head)
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Stress test for concurrent captures on one host.
+
+Starts N writer processes that share one local clone and capture materials at
+the same time against a throwaway local bare repository. Afterwards it clones
+the remote and checks that every material line parses, that no capture was
+lost or duplicated, that all writers resolved the same session id, and that
+the rollup agrees with the materials.
+
+Usage:
+    python stress_capture.py --writers 16 --events 5
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+try:
+    from capture_queue import CaptureQueue
+    from conversation_logger import SessionManager, WeekReportRecorder
+    from git_operations import GitManager
+except ImportError:  # pragma: no cover - script/package dual use
+    from .capture_queue import CaptureQueue
+    from .conversation_logger import SessionManager, WeekReportRecorder
+    from .git_operations import GitManager
+
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+REPO = "stress/week-reports"
+_WORDS = (
+    "tflite xtensa kernel latency quantize fused conv pointwise buffer arena profile "
+    "hotword model dataset eval recall precision firmware flash driver dma cache "
+    "refactor parser config release benchmark regression fix review deploy rollout"
+).split()
+
+
+def _run(*args: str, cwd: str = None) -> str:
+    return subprocess.run(args, cwd=cwd, check=True, capture_output=True, text=True).stdout
+
+
+def create_local_remote(workdir: str) -> str:
+    """Create a bare repository with one empty commit on main and return its path."""
+    remote = os.path.join(workdir, "remote.git")
+    seed = os.path.join(workdir, "seed")
+    _run('git', 'init', '-q', '--bare', '-b', 'main', remote)
+    _run('git', 'init', '-q', '-b', 'main', seed)
+    _run('git', 'commit', '-q', '--allow-empty', '-m', 'Initial commit', cwd=seed)
+    _run('git', 'push', '-q', remote, 'main', cwd=seed)
+    shutil.rmtree(seed)
+    return remote
+
+
+def _sentence(rng: random.Random, length: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(length))
+
+
+def _writer(index: int, args: Dict[str, Any], barrier, results) -> None:
+    logging.getLogger().setLevel(logging.WARNING)
+    SessionManager.SESSION_FILE = os.path.join(args["workdir"], "session.txt")
+    SessionManager.SESSION_DATE_FILE = os.path.join(args["workdir"], "session_date.txt")
+    SessionManager.LOCK_FILE = os.path.join(args["workdir"], "session.lock")
+
+    git = GitManager(
+        "stress", "", REPO,
+        local_path=args["local_path"],
+        backend=args["backend"],
+        remote_url=args["remote"],
+    )
+    recorder = WeekReportRecorder(git, queue=CaptureQueue(Path(args["local_path"])))
+    rng = random.Random(index)
+
+    latencies: List[float] = []
+    successes = 0
+    barrier.wait()
+    for number in range(args["events"]):
+        started = time.perf_counter()
+        ok = recorder.record_conversation(
+            f"writer {index} event {number}: {_sentence(rng, 24)}",
+            f"Done: {_sentence(rng, 16)}",
+            project=f"writer-{index:02d}",
+            tags=["stress"],
+        )
+        latencies.append(time.perf_counter() - started)
+        successes += int(ok)
+    results.put({"writer": index, "successes": successes, "latencies": latencies})
+
+
+def _verify(remote: str, workdir: str, expected: int) -> Dict[str, Any]:
+    checkout = os.path.join(workdir, "verify")
+    _run('git', 'clone', '-q', remote, checkout)
+
+    malformed = 0
+    event_ids: List[str] = []
+    session_guids = set()
+    for path in sorted(Path(checkout).glob("*/week*/materials/*.jsonl")):
+        for line in path.read_text(encoding='utf-8').splitlines():
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError:
+                malformed += 1
+                continue
+            event_ids.append(item["metadata"]["event_id"])
+            session_guids.add(item["metadata"].get("session_guid"))
+
+    rollup_total = 0
+    for path in Path(checkout).glob("*/week*/rollup.json"):
+        rollup_total += json.loads(path.read_text(encoding='utf-8')).get("total", 0)
+
+    return {
+        "materials": len(event_ids),
+        "missing": expected - len(set(event_ids)),
+        "duplicated": len(event_ids) - len(set(event_ids)),
+        "malformed_lines": malformed,
+        "session_ids": len(session_guids),
+        "rollup_total": rollup_total,
+        "commits": int(_run('git', 'rev-list', '--count', 'HEAD', cwd=checkout)) - 1,
+    }
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Run concurrent captures against a local bare repository.")
+    parser.add_argument("--writers", type=int, default=16, help="Concurrent writer processes (default: 16)")
+    parser.add_argument("--events", type=int, default=5, help="Captures per writer (default: 5)")
+    parser.add_argument("--backend", choices=["auto", "subprocess", "dulwich"], default="auto")
+    parser.add_argument("--workdir", help="Directory for the remote and clone (default: a temp dir)")
+    parser.add_argument("--keep", action="store_true", help="Keep the work directory afterwards")
+    return parser
+
+
+def main() -> int:
+    args = _build_parser().parse_args()
+    workdir = args.workdir or tempfile.mkdtemp(prefix="week-report-stress-")
+    os.makedirs(workdir, exist_ok=True)
+    for key, value in (("GIT_AUTHOR_NAME", "stress"), ("GIT_AUTHOR_EMAIL", "stress@localhost")):
+        os.environ.setdefault(key, value)
+        os.environ.setdefault(key.replace("AUTHOR", "COMMITTER"), value)
+
+    try:
+        remote = create_local_remote(workdir)
+        writer_args = {
+            "workdir": workdir,
+            "local_path": os.path.join(workdir, "clones"),
+            "remote": remote,
+            "backend": args.backend,
+            "events": args.events,
+        }
+        # The sync status file lives under ~/.week-report-repo; keep it out of the real one.
+        os.environ["HOME"] = workdir
+
+        context = multiprocessing.get_context("spawn")
+        barrier = context.Barrier(args.writers + 1)
+        results = context.Queue()
+        processes = [
+            context.Process(target=_writer, args=(index, writer_args, barrier, results))
+            for index in range(args.writers)
+        ]
+        for process in processes:
+            process.start()
+        barrier.wait()
+        started = time.perf_counter()
+        reports = [results.get() for _ in processes]
+        elapsed = time.perf_counter() - started
+        for process in processes:
+            process.join()
+
+        expected = args.writers * args.events
+        latencies = sorted(latency for report in reports for latency in report["latencies"])
+        summary = {
+            "writers": args.writers,
+            "events_per_writer": args.events,
+            "successes": sum(report["successes"] for report in reports),
+            "elapsed_s": round(elapsed, 3),
+            "captures_per_s": round(expected / elapsed, 2) if elapsed else None,
+            "latency_p50_ms": round(statistics.median(latencies) * 1000, 1),
+            "latency_max_ms": round(latencies[-1] * 1000, 1),
+            **_verify(remote, workdir, expected),
+        }
+        ok = (
+            summary["successes"] == expected
+            and summary["materials"] == expected
+            and summary["missing"] == 0
+            and summary["malformed_lines"] == 0
+            and summary["session_ids"] == 1
+            and summary["rollup_total"] == expected
+        )
+        summary["ok"] = ok
+        print(json.dumps(summary, indent=2))
+        return 0 if ok else 1
+    finally:
+        if args.keep:
+            logger.info(f"Kept work directory {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Sync worker for queued week report materials.
+
+Drains the local write-ahead log (and replays ``local_queue.jsonl`` failures)
+into one commit per push window. Run it once from cron with ``--drain`` or as a
+long-lived process.
+"""
+
+import argparse
+import logging
+import time
+
+try:
+    from conversation_logger import WeekReportRecorder
+    from git_operations import create_git_manager
+except ImportError:  # pragma: no cover - script/package dual use
+    from .conversation_logger import WeekReportRecorder
+    from .git_operations import create_git_manager
+
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Push queued week report materials to Git.")
+    parser.add_argument("--drain", action="store_true", help="Drain the queue once and exit")
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=60.0,
+        help="Push window in seconds when running continuously (default: 60)",
+    )
+    parser.add_argument("--max-retries", type=int, default=3)
+    parser.add_argument(
+        "--no-replay",
+        action="store_true",
+        help="Do not replay failed captures from local_queue.jsonl",
+    )
+    return parser
+
+
+def main() -> int:
+    parser = _build_parser()
+    args = parser.parse_args()
+
+    git = create_git_manager()
+    if not git:
+        logger.error("Missing Git environment variables for week report system")
+        return 1
+
+    recorder = WeekReportRecorder(git)
+
+    if args.drain:
+        success = recorder.flush_queue(max_retries=args.max_retries, replay_failures=not args.no_replay)
+        return 0 if success else 1
+
+    logger.info("Sync worker started, push window %.0fs", args.interval)
+    try:
+        while True:
+            recorder.flush_queue(max_retries=args.max_retries, replay_failures=not args.no_replay)
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        logger.info("Sync worker stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Compressed per-week material archives for closed weeks.
+
+Compaction folds a week's ``materials/*.jsonl`` files into one compressed
+JSONL stream in timestamp order, ``{year}/week{WW}/materials.jsonl.gz`` (or
+``.zst`` when the optional ``zstandard`` package is installed), and drops the
+redundant ``*.txt`` digests. ``archive.json`` next to it records which source
+file each run of lines came from, so digests can be rebuilt on demand. Readers
+stream the archive line by line and never hold more than one decompressed
+block.
+"""
+
+import gzip
+import heapq
+import io
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_STEM = "materials.jsonl"
+ARCHIVE_CODECS = {"gzip": ".gz", "zstd": ".zst"}
+
+
+def _open_text_reader(path: Path) -> io.TextIOBase:
+    if path.suffix == ".zst":
+        if zstandard is None:
+            raise RuntimeError(f"{path} needs the zstandard package: pip install zstandard")
+        raw = path.open('rb')
+        return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(raw, closefd=True), encoding='utf-8')
+    return gzip.open(path, 'rt', encoding='utf-8')
+
+
+def _open_text_writer(path: Path, codec: str, level: Optional[int]) -> io.TextIOBase:
+    if codec == "zstd":
+        compressor = zstandard.ZstdCompressor(level=level if level is not None else 10)
+        return io.TextIOWrapper(compressor.stream_writer(path.open('wb'), closefd=True), encoding='utf-8')
+    return gzip.open(path, 'wt', encoding='utf-8', compresslevel=level if level is not None else 9)
+
+
+# Records written by the recorder start with their timestamp, so ordering
+# checks can read it without parsing the whole line.
+_TIMESTAMP_PREFIX = re.compile(r'\{"timestamp": "([^"\\]*)"')
+
+
+def record_time(record: Dict[str, Any]) -> str:
+    """Sort key for material records: the ISO timestamp string."""
+    return record.get("timestamp", "")
+
+
+def _line_times(lines) -> Iterator[str]:
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        match = _TIMESTAMP_PREFIX.match(line)
+        if match:
+            yield match.group(1)
+            continue
+        try:
+            yield record_time(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+
+
+def _labelled_time(item: Tuple[str, Dict[str, Any]]) -> str:
+    return record_time(item[1])
+
+
+def _is_sorted(times: Iterator[str]) -> bool:
+    previous = ""
+    for current in times:
+        if current < previous:
+            return False
+        previous = current
+    return True
+
+
+def _within(timestamp: str, since: Optional[str], until: Optional[str]) -> bool:
+    key = timestamp[:19]
+    return (since is None or key >= since) and (until is None or key <= until)
+
+
+def _iter_jsonl(handle, path: Path, since: Optional[str] = None, until: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    bounded = since is not None or until is not None
+    for line in handle:
+        line = line.strip()
+        if not line:
+            continue
+        match = _TIMESTAMP_PREFIX.match(line) if bounded else None
+        if match and not _within(match.group(1), since, until):
+            # Out of range: skipped without parsing the rest of the line.
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            logger.warning("Skipping malformed JSONL line in %s", path)
+            continue
+        if bounded and not match and not _within(record_time(record), since, until):
+            continue
+        yield record
+
+
+class WeekArchive:
+    """Read and write the compacted form of one week directory."""
+
+    MANIFEST = "archive.json"
+    # 2: records in timestamp order, sources recorded as runs
+    VERSION = 2
+
+    @staticmethod
+    def default_codec() -> str:
+        return "zstd" if zstandard is not None else "gzip"
+
+    @staticmethod
+    def find(week_dir: Path) -> Optional[Path]:
+        """Return the week's archive file, if it has been compacted."""
+        for suffix in ARCHIVE_CODECS.values():
+            path = week_dir / f"{ARCHIVE_STEM}{suffix}"
+            if path.exists():
+                return path
+        return None
+
+    @classmethod
+    def read_manifest(cls, week_dir: Path) -> Dict[str, Any]:
+        try:
+            return json.loads((week_dir / cls.MANIFEST).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def live_files(week_dir: Path) -> List[Path]:
+        return sorted((week_dir / "materials").glob("*.jsonl"))
+
+    @staticmethod
+    def is_archive(path) -> bool:
+        name = Path(path).name
+        return any(name == f"{ARCHIVE_STEM}{suffix}" for suffix in ARCHIVE_CODECS.values())
+
+    @staticmethod
+    def read_archive(path: Path) -> Iterator[Dict[str, Any]]:
+        """Stream the records of one archive file."""
+        with _open_text_reader(path) as handle:
+            yield from _iter_jsonl(handle, path)
+
+    @classmethod
+    def iter_archived(cls, week_dir: Path) -> Iterator[Dict[str, Any]]:
+        path = cls.find(week_dir)
+        if path is not None:
+            yield from cls.read_archive(path)
+
+    @classmethod
+    def _labelled_archive(cls, week_dir: Path, archive: Path) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield ``(source_name, record)`` for every archived record, in archive order."""
+        manifest = cls.read_manifest(week_dir)
+        sources = manifest.get("sources", [])
+        if manifest.get("version", 1) >= 2:
+            labels = (
+                sources[int(index)]["name"]
+                for index, length in (run.split(":") for run in manifest.get("runs", "").split())
+                for _ in range(int(length))
+            )
+        else:
+            labels = (source["name"] for source in sources for _ in range(source["count"]))
+        for record in cls.read_archive(archive):
+            # Anything the manifest does not account for is still returned.
+            yield next(labels, archive.name), record
+
+    @classmethod
+    def iter_sources(cls, week_dir: Path) -> Iterator[Tuple[str, Iterator[Dict[str, Any]]]]:
+        """Yield ``(source_name, records)`` per original material file, archived first.
+
+        Each ``records`` iterator must be consumed before advancing to the next
+        source. Archives are stored in timestamp order, so their records are
+        regrouped by source in memory.
+        """
+        archive = cls.find(week_dir)
+        if archive is not None:
+            grouped: Dict[str, List[Dict[str, Any]]] = {}
+            for name, record in cls._labelled_archive(week_dir, archive):
+                grouped.setdefault(name, []).append(record)
+            for name, records in grouped.items():
+                yield name, iter(records)
+        for path in cls.live_files(week_dir):
+            yield path.name, cls._read_live(path)
+
+    @staticmethod
+    def _read_live(path: Path) -> Iterator[Dict[str, Any]]:
+        with path.open('r', encoding='utf-8') as handle:
+            yield from _iter_jsonl(handle, path)
+
+    @staticmethod
+    def _labelled(name: str, records: Iterator[Dict[str, Any]]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        for record in records:
+            yield name, record
+
+    @classmethod
+    def _ordered_runs(cls, week_dir: Path) -> List[Iterator[Tuple[str, Dict[str, Any]]]]:
+        """Timestamp-ordered ``(source_name, record)`` iterators covering the whole week.
+
+        Live files are append-only and normally already in capture order; a
+        cheap timestamp-only scan confirms it, and the file is then streamed.
+        A file that is not (for example a backfilled batch of commits) is read
+        and sorted on its own, so only unsorted files are held in memory.
+        Version 2 archives are written in timestamp order and stream as one
+        run; older archives are sorted in memory.
+        """
+        runs: List[Iterator[Tuple[str, Dict[str, Any]]]] = []
+        archive = cls.find(week_dir)
+        if archive is not None:
+            run = cls._labelled_archive(week_dir, archive)
+            if cls.read_manifest(week_dir).get("version", 1) < 2:
+                run = iter(sorted(run, key=_labelled_time))
+            runs.append(run)
+
+        for path in cls.live_files(week_dir):
+            with path.open('r', encoding='utf-8') as handle:
+                ordered = _is_sorted(_line_times(handle))
+            records = cls._read_live(path)
+            runs.append(cls._labelled(path.name, records if ordered else iter(sorted(records, key=record_time))))
+        return runs
+
+    @classmethod
+    def iter_by_time(cls, week_dir: Path) -> Iterator[Dict[str, Any]]:
+        """Stream every material of a week in timestamp order via a k-way merge of its sources."""
+        for _, record in heapq.merge(*cls._ordered_runs(week_dir), key=_labelled_time):
+            yield record
+
+    @classmethod
+    def iter_records(cls, week_dir: Path) -> Iterator[Dict[str, Any]]:
+        """Stream every material of a week: archived ones first, then live files."""
+        archive = cls.find(week_dir)
+        if archive is not None:
+            yield from cls.read_archive(archive)
+        for path in cls.live_files(week_dir):
+            yield from cls._read_live(path)
+
+    @classmethod
+    def load_between(cls, week_dir: Path, since: Optional[str] = None, until: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return a week's records with ``since <= timestamp <= until``, in timestamp order.
+
+        Bounds are ``YYYY-MM-DDTHH:MM:SS`` strings compared against the first
+        19 characters of each timestamp; None leaves that side open. Lines
+        outside the bounds are rejected on their timestamp prefix before
+        being parsed.
+        """
+        records: List[Dict[str, Any]] = []
+        archive = cls.find(week_dir)
+        if archive is not None:
+            with _open_text_reader(archive) as handle:
+                records.extend(_iter_jsonl(handle, archive, since, until))
+        for path in cls.live_files(week_dir):
+            with path.open('r', encoding='utf-8') as handle:
+                records.extend(_iter_jsonl(handle, path, since, until))
+        # Timsort merges the already sorted per-file runs in close to linear time.
+        records.sort(key=record_time)
+        return records
+
+    @classmethod
+    def compact(cls, week_dir: Path, codec: Optional[str] = None, level: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Fold live material files (and any earlier archive) into one archive.
+
+        Records are written in timestamp order, merged from the sorted
+        sources; the manifest keeps each record's source as ``runs``
+        (``"<source index>:<length>"`` in archive order). Returns the manifest
+        plus before/after sizes and the removed files. Live files are removed
+        only after the new archive and manifest are in place.
+        """
+        codec = codec or cls.default_codec()
+        if codec not in ARCHIVE_CODECS:
+            raise ValueError(f"Unknown archive codec: {codec}")
+        if codec == "zstd" and zstandard is None:
+            raise RuntimeError("zstd archives need the zstandard package: pip install zstandard")
+
+        previous = cls.find(week_dir)
+        live_files = cls.live_files(week_dir)
+        digests = sorted(week_dir.glob("*.txt"))
+        inputs = [*live_files, *digests, *([previous] if previous else [])]
+        bytes_before = sum(path.stat().st_size for path in inputs)
+
+        target = week_dir / f"{ARCHIVE_STEM}{ARCHIVE_CODECS[codec]}"
+        tmp_path = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        positions: Dict[str, int] = {}
+        sources: List[Dict[str, Any]] = []
+        runs: List[List[int]] = []
+        with _open_text_writer(tmp_path, codec, level) as handle:
+            for name, record in heapq.merge(*cls._ordered_runs(week_dir), key=_labelled_time):
+                handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+                index = positions.get(name)
+                if index is None:
+                    index = positions[name] = len(sources)
+                    sources.append({"name": name, "count": 0})
+                sources[index]["count"] += 1
+                if runs and runs[-1][0] == index:
+                    runs[-1][1] += 1
+                else:
+                    runs.append([index, 1])
+        os.replace(tmp_path, target)
+
+        manifest = {
+            "version": cls.VERSION,
+            "codec": codec,
+            "file": target.name,
+            "total": sum(source["count"] for source in sources),
+            "sources": sources,
+            "runs": " ".join(f"{index}:{length}" for index, length in runs),
+        }
+        (week_dir / cls.MANIFEST).write_text(json.dumps(manifest, ensure_ascii=False, indent=2) + "\n", encoding='utf-8')
+
+        removed = [*live_files, *digests]
+        if previous is not None and previous != target:
+            removed.append(previous)
+        for path in removed:
+            path.unlink()
+        materials_dir = week_dir / "materials"
+        if materials_dir.exists() and not any(materials_dir.iterdir()):
+            materials_dir.rmdir()
+
+        return {
+            **manifest,
+            "bytes_before": bytes_before,
+            "bytes_after": target.stat().st_size,
+            "removed": removed,
+        }
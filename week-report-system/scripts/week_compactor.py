@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Compact closed weeks of the report repo into compressed archives.
+
+Weeks that started more than ``--older-than`` weeks before the current one are
+folded into ``{year}/week{WW}/materials.jsonl.gz`` (``.zst`` with the optional
+``zstandard`` package); their ``materials/*.jsonl`` files and ``*.txt`` digests
+are removed in the same commit. Digests of compacted weeks are rendered on
+demand with the ``digest`` command.
+"""
+
+import argparse
+import logging
+import re
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+from typing import List, Optional
+
+try:
+    from conversation_logger import WeekReportRecorder
+    from git_operations import create_git_manager
+    from week_archive import ARCHIVE_CODECS, WeekArchive
+    from week_rollup import WeekRollup
+except ImportError:  # pragma: no cover - script/package dual use
+    from .conversation_logger import WeekReportRecorder
+    from .git_operations import create_git_manager
+    from .week_archive import ARCHIVE_CODECS, WeekArchive
+    from .week_rollup import WeekRollup
+
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+_WEEK_DIR = re.compile(r"^(\d{4})/week(\d{2})$")
+
+
+def closed_weeks(repo_path: str, older_than: int, today: Optional[date] = None) -> List[str]:
+    """Return ``{year}/weekWW`` paths with live files that started ``older_than`` weeks ago or earlier."""
+    today = today or date.today()
+    cutoff = today - timedelta(days=today.weekday(), weeks=older_than)
+    repo_dir = Path(repo_path)
+    weeks: List[str] = []
+    for week_dir in sorted(repo_dir.glob("*/week*")):
+        week_path = week_dir.relative_to(repo_dir).as_posix()
+        match = _WEEK_DIR.match(week_path)
+        if not match or not week_dir.is_dir():
+            continue
+        try:
+            monday = date.fromisocalendar(int(match.group(1)), int(match.group(2)), 1)
+        except ValueError:
+            continue
+        if monday < cutoff and (WeekArchive.live_files(week_dir) or any(week_dir.glob("*.txt"))):
+            weeks.append(week_path)
+    return weeks
+
+
+def compact_weeks(git, older_than: int, codec: Optional[str] = None, level: Optional[int] = None,
+                  dry_run: bool = False, push: bool = True) -> bool:
+    """Compact every closed week in one commit."""
+    with git.locked():
+        if not git.pull():
+            logger.error("Pull failed, not compacting")
+            return False
+
+        weeks = closed_weeks(git.repo_path, older_than)
+        if not weeks:
+            logger.info("No closed weeks left to compact")
+            return True
+        if dry_run:
+            for week_path in weeks:
+                print(week_path)
+            return True
+
+        repo_dir = Path(git.repo_path)
+        for week_path in weeks:
+            week_dir = repo_dir / week_path
+            stats = WeekArchive.compact(week_dir, codec=codec, level=level)
+            for path in [week_dir / stats["file"], week_dir / WeekArchive.MANIFEST, *stats["removed"]]:
+                git.track_file(path.relative_to(repo_dir).as_posix())
+            git.write_file(f"{week_path}/{WeekRollup.FILE_NAME}", WeekRollup.load_current(week_dir).to_json(week_dir))
+            print(f"{week_path}: {stats['total']} material(s), "
+                  f"{stats['bytes_before']} -> {stats['bytes_after']} bytes ({stats['codec']})")
+
+        if not push:
+            return True
+        return git.commit_and_push(f"Compact {len(weeks)} closed week(s)")
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Compact closed weeks of the week report repo.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    compact = subparsers.add_parser("compact", help="Archive weeks older than N weeks")
+    compact.add_argument("--older-than", type=int, default=4, help="Keep this many previous weeks live (default: 4)")
+    compact.add_argument("--codec", choices=sorted(ARCHIVE_CODECS), help="Default: zstd if installed, else gzip")
+    compact.add_argument("--level", type=int, help="Compression level")
+    compact.add_argument("--dry-run", action="store_true", help="Only list the weeks that would be compacted")
+    compact.add_argument("--no-push", action="store_true", help="Compact locally without committing")
+
+    digest = subparsers.add_parser("digest", help="Print the human-readable digest of a week")
+    digest.add_argument("--year", type=int, required=True)
+    digest.add_argument("--week", type=int, required=True)
+    return parser
+
+
+def main() -> int:
+    args = _build_parser().parse_args()
+
+    git = create_git_manager()
+    if not git:
+        logger.error("Missing Git environment variables for week report system")
+        return 1
+
+    if args.command == "digest":
+        git.pull_if_stale()
+        sys.stdout.write(WeekReportRecorder(git).week_digest(args.year, args.week))
+        return 0
+
+    success = compact_weeks(git, args.older_than, codec=args.codec, level=args.level,
+                            dry_run=args.dry_run, push=not args.no_push)
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
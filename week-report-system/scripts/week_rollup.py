@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Materialized per-week rollups for report generation.
+
+``{year}/week{WW}/rollup.json`` holds per-project counts, deduplicated titles,
+outcomes, evidence and next actions, plus the week's SimHash near-duplicate
+index. The recorder updates it incrementally on every capture. It also stores
+the byte size of each ``materials/*.jsonl`` file it covers (and of the week's
+archive once compacted), so a rollup that fell behind (for example after
+merging another machine's captures) is detected with a few ``stat`` calls and
+rebuilt.
+"""
+
+import json
+import logging
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    from capture_queue import material_event_id
+    from near_duplicates import SimHashIndex, event_fingerprint
+    from week_archive import WeekArchive
+except ImportError:  # pragma: no cover - script/package dual use
+    from .capture_queue import material_event_id
+    from .near_duplicates import SimHashIndex, event_fingerprint
+    from .week_archive import WeekArchive
+
+logger = logging.getLogger(__name__)
+
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def _dedup_key(text: str) -> str:
+    return _WHITESPACE.sub(' ', text).strip().casefold()
+
+
+class WeekRollup:
+    """Incrementally maintained summary of one week's materials."""
+
+    FILE_NAME = "rollup.json"
+    VERSION = 3
+    UNASSIGNED_PROJECT = "-"
+    LIST_FIELDS = ("titles", "outcomes", "evidence", "next_actions")
+
+    def __init__(self, week: str, data: Optional[Dict[str, Any]] = None):
+        self.data: Dict[str, Any] = data or {
+            "version": self.VERSION,
+            "week": week,
+            "updated_at": "",
+            "total": 0,
+            "duplicates": 0,
+            "source_types": {},
+            "projects": {},
+            "near_duplicates": SimHashIndex().to_dict(),
+            "sources": {},
+        }
+        self.near_duplicates = SimHashIndex(data=self.data["near_duplicates"])
+        # Serialized through the index's live fingerprint map.
+        self.data["near_duplicates"] = self.near_duplicates.to_dict()
+        # Dedup keys per list, built on first use so each add stays O(1).
+        self._seen: Dict[int, set] = {}
+
+    @staticmethod
+    def week_label(week_dir: Path) -> str:
+        return f"{week_dir.parent.name}-W{week_dir.name[len('week'):]}"
+
+    @classmethod
+    def path_for(cls, week_dir: Path) -> Path:
+        return week_dir / cls.FILE_NAME
+
+    @classmethod
+    def load(cls, week_dir: Path) -> Optional["WeekRollup"]:
+        """Read an existing rollup, or None if it is missing or unreadable."""
+        path = cls.path_for(week_dir)
+        try:
+            data = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != cls.VERSION:
+            return None
+        return cls(data.get("week", cls.week_label(week_dir)), data)
+
+    @staticmethod
+    def material_sizes(week_dir: Path) -> Dict[str, int]:
+        sizes = {path.name: path.stat().st_size for path in WeekArchive.live_files(week_dir)}
+        archive = WeekArchive.find(week_dir)
+        if archive is not None:
+            sizes[archive.name] = archive.stat().st_size
+        return sizes
+
+    def is_current(self, week_dir: Path) -> bool:
+        return self.data.get("sources", {}) == self.material_sizes(week_dir)
+
+    @classmethod
+    def build(cls, week_dir: Path) -> "WeekRollup":
+        """Rebuild a rollup from the week's material files and archive."""
+        rollup = cls(cls.week_label(week_dir))
+        for item in WeekArchive.iter_records(week_dir):
+            rollup.add(item)
+        rollup.data["sources"] = cls.material_sizes(week_dir)
+        return rollup
+
+    @classmethod
+    def load_current(cls, week_dir: Path) -> "WeekRollup":
+        """Return the stored rollup if it covers every material, else rebuild it."""
+        rollup = cls.load(week_dir)
+        if rollup is not None and rollup.is_current(week_dir):
+            return rollup
+        return cls.build(week_dir)
+
+    def _extend_unique(self, target: List[str], values: Iterable[str]) -> None:
+        seen = self._seen.get(id(target))
+        if seen is None:
+            seen = self._seen[id(target)] = {_dedup_key(value) for value in target}
+        for value in values:
+            if not value:
+                continue
+            key = _dedup_key(value)
+            if key and key not in seen:
+                seen.add(key)
+                target.append(value.strip())
+
+    @staticmethod
+    def fingerprint(item: Dict[str, Any]) -> str:
+        metadata = item.get("metadata") or {}
+        return metadata.get("simhash") or event_fingerprint(item.get("summary", ""), item.get("outcome", ""))
+
+    def find_duplicate(self, item: Dict[str, Any]) -> Optional[str]:
+        """Return the event id of an earlier near-duplicate of ``item`` this week."""
+        match = self.near_duplicates.find(self.fingerprint(item))
+        return match if match != material_event_id(item) else None
+
+    def add(self, item: Dict[str, Any]) -> None:
+        """Fold one material record (as stored in JSONL) into the rollup.
+
+        Records flagged with ``metadata.duplicate_of`` are counted and merged
+        into their original: their evidence and next actions are kept, but their
+        title and outcome are not listed again.
+        """
+        duplicate_of = (item.get("metadata") or {}).get("duplicate_of")
+        source_type = item.get("source_type") or "unknown"
+        project_name = item.get("project") or self.UNASSIGNED_PROJECT
+        timestamp = item.get("timestamp", "")
+
+        self.data["total"] += 1
+        self.data["source_types"][source_type] = self.data["source_types"].get(source_type, 0) + 1
+
+        project = self.data["projects"].setdefault(project_name, {
+            "count": 0,
+            "source_types": {},
+            "tags": {},
+            "duplicates": 0,
+            "first_timestamp": timestamp,
+            "last_timestamp": timestamp,
+            **{name: [] for name in self.LIST_FIELDS},
+        })
+        project["count"] += 1
+        project["source_types"][source_type] = project["source_types"].get(source_type, 0) + 1
+        for tag in item.get("tags") or []:
+            project["tags"][tag] = project["tags"].get(tag, 0) + 1
+        if timestamp:
+            project["first_timestamp"] = min(filter(None, [project["first_timestamp"], timestamp]))
+            project["last_timestamp"] = max(project["last_timestamp"], timestamp)
+
+        self._extend_unique(project["evidence"], item.get("evidence") or [])
+        self._extend_unique(project["next_actions"], item.get("next_actions") or [])
+        if duplicate_of:
+            self.data["duplicates"] += 1
+            project["duplicates"] += 1
+            return
+
+        self._extend_unique(project["titles"], [item.get("title", "")])
+        self._extend_unique(project["outcomes"], [item.get("outcome", "")])
+        self.near_duplicates.add(material_event_id(item), self.fingerprint(item))
+
+    def to_json(self, week_dir: Path) -> str:
+        """Serialize with ``sources`` refreshed from the current material files."""
+        self.data["sources"] = self.material_sizes(week_dir)
+        self.data["updated_at"] = datetime.now().isoformat(timespec='seconds')
+        return json.dumps(self.data, ensure_ascii=False, indent=2, sort_keys=True) + "\n"
@@ -0,0 +1,68 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+from async_recorder import AsyncWeekReportRecorder  # noqa: E402
+from capture_queue import CaptureQueue  # noqa: E402
+from conversation_logger import MaterialEvent  # noqa: E402
+
+
+def _git(*args, cwd=None):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+def test_spilled_events_sync_from_a_custom_queue(tmp_path):
+    remote = tmp_path / "remote.git"
+    _git("init", "--bare", "-b", "main", str(remote))
+    seed = tmp_path / "seed"
+    _git("clone", str(remote), str(seed))
+    (seed / "README.md").write_text("reports\n")
+    _git("add", "README.md", cwd=seed)
+    _git("-c", "user.name=t", "-c", "user.email=t@t", "commit", "-m", "init", cwd=seed)
+    _git("push", "origin", "HEAD:main", cwd=seed)
+
+    home = tmp_path / "home"
+    home.mkdir()
+    env = dict(
+        os.environ,
+        HOME=str(home),
+        WEEK_REPORT_GIT_USERNAME="t",
+        WEEK_REPORT_GIT_PERSONAL_TOKEN="t",
+        WEEK_REPORT_GIT_REPO="t/reports",
+        WEEK_REPORT_GIT_REMOTE_URL=str(remote),
+        WEEK_REPORT_GIT_BACKEND="subprocess",
+        GIT_AUTHOR_NAME="t", GIT_AUTHOR_EMAIL="t@t",
+        GIT_COMMITTER_NAME="t", GIT_COMMITTER_EMAIL="t@t",
+    )
+    queue = CaptureQueue(tmp_path / "queue")
+
+    async def capture():
+        recorder = AsyncWeekReportRecorder(
+            max_pending=1, env=env, queue=queue, local_path=str(tmp_path / "clone"),
+        )
+        async with recorder:
+            for i in range(3):
+                recorder.submit(MaterialEvent(
+                    timestamp="2026-10-14T10:00:00", source_type="manual_note", title=f"note {i}", summary=f"body {i}",
+                ))
+        return recorder
+
+    recorder = asyncio.run(capture())
+
+    assert recorder.spilled >= 1
+    assert recorder.failed_batches == 0
+    assert not queue.wal_file.exists() or not queue.wal_file.read_text().strip()
+    assert not (home / ".week-report-repo" / "capture_wal.jsonl").exists()
+
+    check = tmp_path / "check"
+    _git("clone", str(remote), str(check))
+    titles = set()
+    for path in check.rglob("*.jsonl"):
+        for line in path.read_text().splitlines():
+            titles.add(json.loads(line).get("title"))
+    assert {"note 0", "note 1", "note 2"} <= titles
@@ -0,0 +1,18 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import extractive_summary  # noqa: E402
+from extractive_summary import MAX_SCORED_CHARS, score_sentences  # noqa: E402
+
+
+def test_long_text_scores_a_sample_including_first_and_last():
+    sentences = [f"量化模型 sentence {i} about latency regression fix" for i in range(2000)]
+    assert sum(map(len, sentences)) > MAX_SCORED_CHARS
+
+    for method in extractive_summary.METHODS:
+        scores = score_sentences(sentences, method)
+        assert len(scores) == len(sentences)
+        assert scores[0] > 0 and scores[-1] > 0
+        assert scores.count(0.0) > len(sentences) // 2
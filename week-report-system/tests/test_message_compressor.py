@@ -0,0 +1,16 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+from conversation_logger import MessageCompressor  # noqa: E402
+
+
+def test_short_message_is_only_stripped():
+    assert MessageCompressor.compress("  need x\n") == "need x"
+
+
+def test_crlf_message_is_compressed_like_lf():
+    # 560 characters with CRLF, 490 once the line endings are normalised.
+    message = "need x\r\n" * 70
+    assert MessageCompressor.compress(message) == " ".join(["need x"] * 70)
@@ -0,0 +1,53 @@
+import subprocess
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+from capture_queue import CaptureQueue  # noqa: E402
+from conversation_logger import MaterialEvent, WeekReportRecorder  # noqa: E402
+from git_operations import GitManager  # noqa: E402
+
+
+def _git(*args, cwd=None):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+def _recorder(tmp_path, name, **options):
+    git = GitManager(
+        "t", "", "t/reports", local_path=str(tmp_path / name), backend="subprocess",
+        remote_url=str(tmp_path / "remote.git"), **options,
+    )
+    return WeekReportRecorder(git, queue=CaptureQueue(tmp_path / name / "state"))
+
+
+def test_query_widens_sparse_checkout_to_queried_weeks(tmp_path, monkeypatch):
+    for key in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{key}_NAME", "t")
+        monkeypatch.setenv(f"GIT_{key}_EMAIL", "t@t")
+    remote = tmp_path / "remote.git"
+    _git("init", "--bare", "-b", "main", str(remote))
+    seed = tmp_path / "seed"
+    _git("clone", str(remote), str(seed))
+    (seed / "README.md").write_text("reports\n")
+    _git("add", "README.md", cwd=seed)
+    _git("commit", "-m", "init", cwd=seed)
+    _git("push", "origin", "HEAD:main", cwd=seed)
+
+    writer = _recorder(tmp_path, "writer")
+    assert writer.git.pull()
+    assert writer.record_events([
+        MaterialEvent(timestamp=f"2025-0{month}-10T10:00:00", source_type="manual_note", title=f"m{month}", summary="s")
+        for month in (1, 3, 5)
+    ])
+
+    reader = _recorder(tmp_path, "reader", sparse_weeks=0)
+    assert reader.git.pull()
+    assert not (Path(reader.git.repo_path) / "2025").exists()
+
+    titles = [item["title"] for item in reader.query_materials(since="2025-02-01", until="2025-04-01")]
+    assert titles == ["m3"]
+    titles = [item["title"] for item in reader.query_materials(until="2025-04-01")]
+    assert titles == ["m1", "m3"]
+    titles = [item["title"] for item in reader.query_materials()]
+    assert titles == ["m1", "m3", "m5"]